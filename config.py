@@ -26,6 +26,10 @@ class TestingConfig(Config):
 
 # Model configuration
 MODEL_PATH = os.path.join(os.path.dirname(__file__), 'models', 'my_model_nn_1.h5')
+CALIBRATION_PATH = os.path.join(os.path.dirname(__file__), 'models', 'calibration.json')
+DRIFT_PROFILE_PATH = os.path.join(os.path.dirname(__file__), 'models', 'drift_profile.json')
+FEATURE_STORE_PATH = os.environ.get('FEATURE_STORE_PATH') or os.path.join(os.path.dirname(__file__), 'data', 'feature_store.bin')
+TENANTS_PATH = os.environ.get('TENANTS_PATH') or os.path.join(os.path.dirname(__file__), 'models', 'tenants.json')
 
 # Feature mappings
 GENDER_MAPPING = {'Male': 0, 'Female': 1}
@@ -58,6 +62,53 @@ OBESITY_LABELS = {
 # Numerical columns
 NUMERICAL_COLUMNS = ['age', 'height', 'weight', 'fcvc', 'ncp', 'faf', 'tue', 'ch2o']
 
+# Categorical columns and their mappings
+CATEGORICAL_MAPPINGS = {
+    'gender': GENDER_MAPPING,
+    'family_history_with_overweight': FAMILY_HISTORY_MAPPING,
+    'favc': FAVC_MAPPING,
+    'caec': CAEC_MAPPING,
+    'smoke': SMOKE_MAPPING,
+    'scc': SCC_MAPPING,
+    'calc': CALC_MAPPING,
+    'mtrans': MTRANS_MAPPING
+}
+
+# Encoded feature order (matches the input form)
+FEATURE_COLUMNS = [
+    'gender', 'age', 'height', 'weight', 'family_history_with_overweight',
+    'favc', 'fcvc', 'ncp', 'caec', 'smoke', 'ch2o', 'scc', 'faf', 'tue', 'calc', 'mtrans'
+]
+
+# Scoring configuration
+DEFAULT_TOP_K = 3
+LOW_CONFIDENCE_THRESHOLD = 0.5
+
+# What-if analysis: lifestyle fields that may be adjusted and the batch cap
+WHATIF_FIELDS = ['faf', 'ch2o', 'fcvc', 'tue', 'favc', 'mtrans']
+MAX_WHATIF_VARIANTS = 1000
+
+# Form ranges (min, max) of the numerical what-if fields
+WHATIF_DOMAINS = {'faf': (0, 3), 'ch2o': (1, 5), 'fcvc': (1, 3), 'tue': (0, 2)}
+
+# Multi-tenant scoring: tenant selected by header or /t/<tenant>/ path prefix
+DEFAULT_TENANT = 'default'
+TENANT_HEADER = 'X-Tenant'
+
+# Feature store: rows allocated when the store file is created, and the
+# maximum length of a patient/record ID
+FEATURE_STORE_CAPACITY = 100000
+FEATURE_STORE_ID_WIDTH = 32
+
+# Drift monitoring: per-worker sketch directory, flush interval and report
+# window (seconds), histogram bins per numerical column and the PSI level
+# that flags drift
+DRIFT_DIR = os.environ.get('DRIFT_DIR', os.path.join('/tmp', 'obesity-prediction-drift'))
+DRIFT_FLUSH_INTERVAL = 30
+DRIFT_WINDOW = 24 * 3600
+DRIFT_BINS = 10
+DRIFT_PSI_THRESHOLD = 0.2
+
 # Configuration dictionary
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,62 @@
+"""
+Loading of the labelled obesity dataset (``trained.xlsx`` / CSV exports).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from config import FEATURE_COLUMNS, OBESITY_LABELS
+from models.scoring import encode_records
+
+# Dataset column names mapped to the form field names
+DATASET_COLUMNS = {
+    'Gender': 'gender', 'Age': 'age', 'Height': 'height', 'Weight': 'weight',
+    'family_history_with_overweight': 'family_history_with_overweight',
+    'FAVC': 'favc', 'FCVC': 'fcvc', 'NCP': 'ncp', 'CAEC': 'caec', 'SMOKE': 'smoke',
+    'CH2O': 'ch2o', 'SCC': 'scc', 'FAF': 'faf', 'TUE': 'tue', 'CALC': 'calc', 'MTRANS': 'mtrans'
+}
+
+TARGET_COLUMN = 'NObeyesdad'
+
+# Dataset labels (e.g. 'Overweight_Level_I') mapped to OBESITY_LABELS indices
+TARGET_MAPPING = {label.replace(' ', '_'): index for index, label in OBESITY_LABELS.items()}
+
+
+def read_dataset(path):
+    """Read the raw dataset as form records (height converted to cm).
+
+    As in the notebook, missing numerical values are filled with the column
+    mean and missing categorical values with the most frequent value.
+    """
+    if os.path.splitext(path)[1].lower() in ('.xlsx', '.xls'):
+        data = pd.read_excel(path)
+    else:
+        data = pd.read_csv(path)
+
+    data = data.rename(columns=DATASET_COLUMNS)
+    for column in FEATURE_COLUMNS:
+        if pd.api.types.is_numeric_dtype(data[column]):
+            data[column] = data[column].fillna(data[column].mean())
+        else:
+            data[column] = data[column].fillna(data[column].mode()[0])
+
+    # The dataset stores height in metres, the form in centimetres
+    if data['height'].max() < 3:
+        data['height'] = data['height'] * 100
+    return data
+
+
+def load_dataset(path):
+    """Load the dataset as an encoded feature matrix and label indices.
+
+    Rows without a label are dropped.
+    """
+    data = read_dataset(path)
+    data = data[data[TARGET_COLUMN].notnull()]
+    X = encode_records(data[FEATURE_COLUMNS].to_dict('records'))
+    y = data[TARGET_COLUMN].map(TARGET_MAPPING)
+    if y.isnull().any():
+        raise ValueError(f"Unknown labels in {TARGET_COLUMN}: {sorted(data[TARGET_COLUMN][y.isnull()].unique())}")
+    return X, y.to_numpy(dtype=np.int64)
@@ -0,0 +1,278 @@
+"""
+Drift monitoring for live ``/predict`` traffic.
+
+Each gunicorn worker keeps a constant-memory sketch of the requests it has
+seen: fixed-bin histograms for ``NUMERICAL_COLUMNS`` (bins taken from training
+data quantiles) and counts for every categorical mapping in ``config.py``.
+Workers periodically write their counts to ``DRIFT_DIR``; the sketches merge by
+summing, and are compared against the stored training profile with PSI and a
+binned KS statistic.
+
+Counts cover one ``DRIFT_WINDOW`` (a day by default): each window gets fresh
+sketch files and files from earlier windows are removed. Every file carries a
+fingerprint of the profile's bin edges, so counts binned against an older
+profile are never merged after a re-profile.
+
+Usage:
+    python -m data.drift profile path/to/trained.xlsx
+    python -m data.drift report
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from bisect import bisect_right
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import NUMERICAL_COLUMNS, CATEGORICAL_MAPPINGS
+from config import DRIFT_PROFILE_PATH, DRIFT_DIR, DRIFT_FLUSH_INTERVAL, DRIFT_WINDOW
+from config import DRIFT_BINS, DRIFT_PSI_THRESHOLD
+
+# Floor applied to bin proportions so empty bins do not make PSI infinite
+PSI_EPSILON = 1e-4
+
+
+class DriftSketch:
+    """Histogram and category counts over the input features."""
+
+    def __init__(self, edges, counts=None):
+        # Interior bin edges per numerical column; one extra bucket per
+        # categorical column collects unknown values
+        self.edges = {col: [float(edge) for edge in edges[col]] for col in NUMERICAL_COLUMNS}
+        self.slices = {}
+        offset = 0
+        for col in NUMERICAL_COLUMNS:
+            self.slices[col] = slice(offset, offset + len(self.edges[col]) + 1)
+            offset += len(self.edges[col]) + 1
+        for col, mapping in CATEGORICAL_MAPPINGS.items():
+            self.slices[col] = slice(offset, offset + len(mapping) + 1)
+            offset += len(mapping) + 1
+
+        self.counts = [0] * offset if counts is None else [int(c) for c in counts]
+        if len(self.counts) != offset:
+            raise ValueError(f"Expected {offset} counts, got {len(self.counts)}")
+        self.total = 0 if counts is None else int(sum(self.counts[self.slices['age']]))
+
+    def empty_like(self):
+        """A new, empty sketch with the same bins."""
+        return DriftSketch(self.edges)
+
+    def update(self, record):
+        """Add one form record; malformed records are ignored."""
+        try:
+            values = [float(record[col]) for col in NUMERICAL_COLUMNS]
+        except (KeyError, TypeError, ValueError):
+            return
+        if not all(math.isfinite(value) for value in values):
+            return
+        indices = [self.slices[col].start + bisect_right(self.edges[col], value)
+                   for col, value in zip(NUMERICAL_COLUMNS, values)]
+        for col, mapping in CATEGORICAL_MAPPINGS.items():
+            indices.append(self.slices[col].start + mapping.get(record.get(col), len(mapping)))
+
+        counts = self.counts
+        for i in indices:
+            counts[i] += 1
+        self.total += 1
+
+    def update_batch(self, data):
+        """Add a DataFrame of form records in one vectorized pass.
+
+        Rows with missing or non-finite numerical values are ignored.
+        """
+        numeric = data[NUMERICAL_COLUMNS].astype(float)
+        data = data[np.isfinite(numeric.to_numpy()).all(axis=1)]
+        counts = np.asarray(self.counts, dtype=np.int64)
+        for col in NUMERICAL_COLUMNS:
+            bins = np.searchsorted(self.edges[col], data[col].astype(float).to_numpy(), side='right')
+            counts[self.slices[col]] += np.bincount(bins, minlength=len(self.edges[col]) + 1)
+        for col, mapping in CATEGORICAL_MAPPINGS.items():
+            codes = data[col].map(mapping).fillna(len(mapping)).astype(int).to_numpy()
+            counts[self.slices[col]] += np.bincount(codes, minlength=len(mapping) + 1)
+        self.counts = counts.tolist()
+        self.total += len(data)
+
+    def merge(self, counts):
+        """Add the counts of another sketch with the same bins."""
+        if len(counts) != len(self.counts):
+            raise ValueError("Cannot merge sketches with different bins")
+        self.counts = [a + int(b) for a, b in zip(self.counts, counts)]
+        self.total = int(sum(self.counts[self.slices['age']]))
+
+    def column(self, col):
+        """Counts for one column as an array."""
+        return np.asarray(self.counts[self.slices[col]], dtype=float)
+
+
+def build_profile(data, bins=DRIFT_BINS):
+    """Build the training-data sketch, with numerical bins at quantiles of the finite values."""
+    edges = {}
+    for col in NUMERICAL_COLUMNS:
+        values = data[col].astype(float).to_numpy()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            raise ValueError(f"No finite values for {col}, cannot build a profile")
+        edges[col] = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])).tolist()
+    sketch = DriftSketch(edges)
+    sketch.update_batch(data)
+    return sketch
+
+
+def profile_fingerprint(sketch):
+    """Short hash of the sketch's bin edges; counts only merge under equal edges."""
+    edges = json.dumps(sketch.edges, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(edges).hexdigest()[:16]
+
+
+def save_profile(sketch, path=DRIFT_PROFILE_PATH):
+    """Store the training profile next to the model artifact."""
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump({'edges': sketch.edges, 'counts': sketch.counts}, fh)
+
+
+def load_profile(path=DRIFT_PROFILE_PATH):
+    """Load the training profile, or None if it has not been built."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as fh:
+        profile = json.load(fh)
+    return DriftSketch(profile['edges'], profile['counts'])
+
+
+def drift_scores(reference, live, threshold=DRIFT_PSI_THRESHOLD):
+    """PSI per column (and binned KS for numerical columns) of live vs. reference."""
+    report = {'samples': live.total, 'columns': {}, 'drifted': []}
+    if live.total == 0:
+        return report
+
+    for col in reference.slices:
+        expected = reference.column(col)
+        actual = live.column(col)
+        expected = np.maximum(expected / expected.sum(), PSI_EPSILON)
+        actual = np.maximum(actual / actual.sum(), PSI_EPSILON)
+
+        scores = {'psi': round(float(np.sum((actual - expected) * np.log(actual / expected))), 4)}
+        if col in NUMERICAL_COLUMNS:
+            scores['ks'] = round(float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected)))), 4)
+        report['columns'][col] = scores
+        if scores['psi'] > threshold:
+            report['drifted'].append(col)
+    return report
+
+
+class DriftMonitor:
+    """Per-worker live sketch, flushed to ``directory`` for cross-worker merging."""
+
+    def __init__(self, profile_path=DRIFT_PROFILE_PATH, directory=DRIFT_DIR,
+                 flush_interval=DRIFT_FLUSH_INTERVAL, window=DRIFT_WINDOW):
+        self.reference = load_profile(profile_path)
+        self.sketch = self.reference.empty_like() if self.reference is not None else None
+        self.fingerprint = profile_fingerprint(self.reference) if self.reference is not None else None
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.window = window
+        self.period = self._period()
+        self._last_flush = time.monotonic()
+
+    @property
+    def enabled(self):
+        return self.reference is not None
+
+    def _period(self):
+        return int(time.time() // self.window)
+
+    def _path(self):
+        return os.path.join(self.directory, f'w{self.period}-{os.getpid()}.json')
+
+    def _rotate(self):
+        """Start an empty sketch when a new window begins."""
+        period = self._period()
+        if period != self.period:
+            self.period = period
+            self.sketch = self.reference.empty_like()
+
+    def update(self, record):
+        """Record one request; cheap enough to run on every call."""
+        if self.sketch is None:
+            return
+        self._rotate()
+        self.sketch.update(record)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write this worker's counts for the current window atomically."""
+        if self.sketch is None:
+            return
+        self._rotate()
+        self._last_flush = time.monotonic()
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump({'profile': self.fingerprint, 'period': self.period,
+                       'counts': self.sketch.counts}, fh)
+        os.replace(tmp_path, self._path())
+        self._expire()
+
+    def _expire(self):
+        """Remove sketch files from earlier windows."""
+        for path in glob.glob(os.path.join(self.directory, 'w*-*.json')):
+            try:
+                if int(os.path.basename(path)[1:].split('-')[0]) < self.period:
+                    os.remove(path)
+            except (OSError, ValueError):
+                continue  # Already removed by another worker, or not a sketch file
+
+    def merged(self):
+        """This worker's live sketch merged with the other workers' flushes in this window."""
+        self._rotate()
+        merged = self.sketch.empty_like()
+        merged.merge(self.sketch.counts)
+        for path in glob.glob(os.path.join(self.directory, f'w{self.period}-*.json')):
+            if path == self._path():
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as fh:
+                    flushed = json.load(fh)
+                if flushed['profile'] != self.fingerprint or flushed['period'] != self.period:
+                    continue  # Binned against another profile
+                merged.merge(flushed['counts'])
+            except (OSError, ValueError, KeyError, TypeError):
+                continue  # Half-written or malformed file
+        return merged
+
+    def report(self):
+        """Drift scores of all live traffic against the training profile."""
+        if not self.enabled:
+            return {'error': 'No training profile, run: python -m data.drift profile <dataset>'}
+        report = drift_scores(self.reference, self.merged())
+        return {'window_start': self.period * self.window, **report}
+
+
+def main():
+    """Build the training profile or print the current drift report."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    profile = commands.add_parser('profile', help='Build the training-data profile')
+    profile.add_argument('dataset', help='Training dataset (.xlsx or .csv)')
+    commands.add_parser('report', help='Merge worker sketches and score drift')
+    args = parser.parse_args()
+
+    if args.command == 'profile':
+        from data.dataset import read_dataset
+        sketch = build_profile(read_dataset(args.dataset))
+        save_profile(sketch)
+        print(f"Profile of {sketch.total} rows written to {DRIFT_PROFILE_PATH}")
+    else:
+        print(json.dumps(DriftMonitor(flush_interval=float('inf')).report(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""
+Memory-mapped feature store for repeat patients.
+
+Holds each patient's latest encoded feature row and last prediction in one
+fixed-width columnar file (``FEATURE_STORE_PATH``) that every gunicorn worker
+and the bulk CLI map into memory. Rows are keyed by tenant and patient ID, so
+clinics never see or overwrite each other's patients. Writes take an exclusive ``flock``;
+reads are lock-free and pick up rows appended by other processes from the
+shared row count in the header.
+
+A partial update re-encodes only the fields it carries, and a row is only
+marked dirty if an encoded value actually changed. Rescoring skips rows that
+are clean and were scored with the tenant's current model version.
+
+Usage:
+    python -m data.feature_store ingest patients.csv --id-column patient_id
+    python -m data.feature_store rescore
+    python -m data.feature_store show <patient_id> --tenant clinic-a
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import FEATURE_COLUMNS, DEFAULT_TENANT
+from config import FEATURE_STORE_PATH, FEATURE_STORE_CAPACITY, FEATURE_STORE_ID_WIDTH
+from models.scoring import FEATURE_INDEX, LABEL_NAMES, encode_records, encode_values
+
+MAGIC = 0x3153464F  # b'OFS1'
+FORMAT_VERSION = 1
+
+# Header: magic, format version, capacity, ID width, row count (uint64 each)
+HEADER_FIELDS = 5
+HEADER_BYTES = 64
+COUNT = 4
+
+VERSION_WIDTH = 16
+
+
+def _layout(capacity, id_width):
+    """Column names, dtypes, shapes and byte offsets, plus the file size."""
+    columns = [
+        ('ids', f'S{id_width}', (capacity,)),
+        ('tenants', f'S{id_width}', (capacity,)),
+        ('features', 'f8', (len(FEATURE_COLUMNS), capacity)),
+        ('labels', 'i1', (capacity,)),
+        ('confidence', 'f4', (capacity,)),
+        ('model_versions', f'S{VERSION_WIDTH}', (capacity,)),
+        ('dirty', 'u1', (capacity,)),
+        ('updated', 'f8', (capacity,))
+    ]
+    layout, offset = [], HEADER_BYTES
+    for name, dtype, shape in columns:
+        dtype = np.dtype(dtype)
+        layout.append((name, dtype, shape, offset))
+        size = dtype.itemsize * int(np.prod(shape))
+        offset += -(-size // 8) * 8  # Keep every column 8-byte aligned
+    return layout, offset
+
+
+class FeatureStore:
+    """Fixed-width, memory-mapped store of encoded feature rows by tenant and patient ID."""
+
+    def __init__(self, path=FEATURE_STORE_PATH, capacity=FEATURE_STORE_CAPACITY,
+                 id_width=FEATURE_STORE_ID_WIDTH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._lock():
+            if os.fstat(self._fd).st_size == 0:
+                header = np.array([MAGIC, FORMAT_VERSION, capacity, id_width, 0], dtype=np.uint64)
+                os.ftruncate(self._fd, _layout(capacity, id_width)[1])
+                os.pwrite(self._fd, header.tobytes(), 0)
+
+        header = np.frombuffer(os.pread(self._fd, HEADER_FIELDS * 8, 0), dtype=np.uint64)
+        if header[0] != MAGIC or header[1] != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a feature store (format {FORMAT_VERSION})")
+        self.capacity, self.id_width = int(header[2]), int(header[3])
+
+        layout, size = _layout(self.capacity, self.id_width)
+        self._map = np.memmap(path, dtype=np.uint8, mode='r+', shape=(size,))
+        self._header = self._map[:HEADER_FIELDS * 8].view(np.uint64)
+        for name, dtype, shape, offset in layout:
+            nbytes = dtype.itemsize * int(np.prod(shape))
+            setattr(self, name, self._map[offset:offset + nbytes].view(dtype).reshape(shape))
+        self._index = {}
+
+    def __len__(self):
+        return int(self._header[COUNT])
+
+    @contextmanager
+    def _lock(self):
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Index rows appended since the last call (possibly by other processes)."""
+        for row in range(len(self._index), len(self)):
+            self._index[(self.tenants[row].decode('utf-8'), self.ids[row].decode('utf-8'))] = row
+
+    def _key(self, value):
+        key = str(value).encode('utf-8')
+        if not key or len(key) > self.id_width:
+            raise ValueError(f"IDs and tenants must be 1-{self.id_width} bytes: {value!r}")
+        return key
+
+    def row(self, record_id, tenant=DEFAULT_TENANT):
+        """Row index of ``record_id`` within ``tenant``, or None."""
+        self._refresh()
+        return self._index.get((str(tenant), str(record_id)))
+
+    def _append(self, record_ids, tenants, X):
+        """Append new rows; the row count is published after the data is written."""
+        start = len(self)
+        end = start + len(record_ids)
+        if end > self.capacity:
+            raise ValueError(f"Feature store is full ({self.capacity} rows)")
+        self.ids[start:end] = [self._key(record_id) for record_id in record_ids]
+        self.tenants[start:end] = [self._key(tenant) for tenant in tenants]
+        self.features[:, start:end] = X.T
+        self.labels[start:end] = -1
+        self.confidence[start:end] = 0
+        self.model_versions[start:end] = b''
+        self.dirty[start:end] = 1
+        self.updated[start:end] = time.time()
+        self._header[COUNT] = end
+        self._refresh()
+
+    def upsert(self, record_id, fields, tenant=DEFAULT_TENANT):
+        """Insert a full record, or update only the fields present in ``fields``.
+
+        Returns the row index and whether any stored value changed.
+        """
+        with self._lock():
+            row = self.row(record_id, tenant)
+            if row is None:
+                self._append([record_id], [tenant], encode_records([fields]))
+                return self.row(record_id, tenant), True
+
+            # Validate every field before writing any, so a rejected update leaves no trace
+            values = {field: encode_values(field, [fields[field]])[0]
+                      for field in FEATURE_COLUMNS if field in fields}
+            changed = False
+            for field, value in values.items():
+                if self.features[FEATURE_INDEX[field], row] != value:
+                    self.features[FEATURE_INDEX[field], row] = value
+                    changed = True
+            if changed:
+                self.dirty[row] = 1
+                self.updated[row] = time.time()
+            return row, changed
+
+    def upsert_many(self, record_ids, records, tenants=None):
+        """Bulk upsert of full records; only rows whose values changed become dirty.
+
+        Returns the number of new and changed rows.
+        """
+        record_ids = [str(record_id) for record_id in record_ids]
+        tenants = [DEFAULT_TENANT] * len(record_ids) if tenants is None else list(map(str, tenants))
+        X = encode_records(records)
+
+        # Later duplicates of a (tenant, ID) pair win
+        last = {key: i for i, key in enumerate(zip(tenants, record_ids))}
+        positions = np.fromiter(last.values(), dtype=int, count=len(last))
+
+        with self._lock():
+            self._refresh()
+            rows = np.array([self._index.get(key, -1) for key in last], dtype=int)
+            existing = rows >= 0
+
+            old_rows, old_positions = rows[existing], positions[existing]
+            changed = (self.features[:, old_rows].T != X[old_positions]).any(axis=1)
+            changed_rows = old_rows[changed]
+            self.features[:, changed_rows] = X[old_positions[changed]].T
+            self.dirty[changed_rows] = 1
+            self.updated[changed_rows] = time.time()
+
+            new_positions = positions[~existing]
+            self._append([record_ids[i] for i in new_positions],
+                         [tenants[i] for i in new_positions], X[new_positions])
+        return len(new_positions), int(changed.sum())
+
+    def record_predictions(self, rows, X, labels, confidence, model_versions):
+        """Store predictions for rows whose features still equal the scored ``X``."""
+        with self._lock():
+            current = (self.features[:, rows].T == X).all(axis=1)
+            rows = rows[current]
+            self.labels[rows] = labels[current]
+            self.confidence[rows] = confidence[current]
+            self.model_versions[rows] = np.asarray(model_versions, dtype=self.model_versions.dtype)[current]
+            self.dirty[rows] = 0
+
+    def _tenant_indices(self, tenant_table, rows):
+        """Tenant index per row, or -1 where the tenant is no longer in the bundle."""
+        names, inverse = np.unique(self.tenants[rows], return_inverse=True)
+        lookup = np.array([tenant_table.index.get(name.decode('utf-8'), -1) for name in names],
+                          dtype=int)
+        return lookup[inverse]
+
+    def orphaned(self, tenant_table):
+        """Rows whose tenant is not in the bundle; they are skipped when rescoring."""
+        return np.flatnonzero(self._tenant_indices(tenant_table, np.arange(len(self))) < 0)
+
+    def stale(self, tenant_table):
+        """Rows that are dirty or were scored with an outdated model version."""
+        rows = np.arange(len(self))
+        indices = self._tenant_indices(tenant_table, rows)
+        rows, indices = rows[indices >= 0], indices[indices >= 0]
+        expected = np.array(tenant_table.model_versions, dtype=self.model_versions.dtype)[indices]
+        return rows[(self.dirty[rows] == 1) | (self.model_versions[rows] != expected)]
+
+    def rescore(self, tenant_table, rows=None, batch_size=10000):
+        """Score stale rows in vectorized batches; returns the number scored.
+
+        Rows of tenants that are no longer in the bundle are skipped.
+        """
+        if rows is None:
+            rows = self.stale(tenant_table)
+        rows = rows[self._tenant_indices(tenant_table, rows) >= 0]
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            X = np.array(self.features[:, chunk].T)
+            indices = self._tenant_indices(tenant_table, chunk)
+            result = tenant_table.score(X, indices)
+            versions = np.array(tenant_table.model_versions)[indices]
+            self.record_predictions(chunk, X, result['labels'], result['confidence'], versions)
+        return len(rows)
+
+    def get(self, record_id, tenant=DEFAULT_TENANT):
+        """Stored features and last prediction of ``record_id`` within ``tenant``, or None."""
+        row = self.row(record_id, tenant)
+        if row is None:
+            return None
+        label = int(self.labels[row])
+        return {
+            'id': str(record_id),
+            'tenant': self.tenants[row].decode('utf-8'),
+            'features': dict(zip(FEATURE_COLUMNS, self.features[:, row].tolist())),
+            'prediction': LABEL_NAMES[label] if label >= 0 else None,
+            'confidence': round(float(self.confidence[row]), 4),
+            'model_version': self.model_versions[row].decode('utf-8'),
+            'stale': bool(self.dirty[row]),
+            'updated': float(self.updated[row])
+        }
+
+    def close(self):
+        self._map.flush()
+        os.close(self._fd)
+
+
+def main():
+    """Ingest bulk records, rescore stale rows or show one stored patient."""
+    from data.dataset import read_dataset
+    from models.tenants import load_tenants
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help='Upsert records and rescore changed rows')
+    ingest.add_argument('records', help='Records file (.csv or .xlsx)')
+    ingest.add_argument('--id-column', default='patient_id', help='Patient/record ID column')
+    ingest.add_argument('--tenant-column', help='Tenant column (default tenant if omitted)')
+    commands.add_parser('rescore', help='Rescore rows with changed features or model version')
+    show = commands.add_parser('show', help='Show one stored patient')
+    show.add_argument('record_id')
+    show.add_argument('--tenant', default=DEFAULT_TENANT, help='Tenant of the patient')
+    args = parser.parse_args()
+
+    store = FeatureStore()
+    tenant_table = load_tenants()
+    if args.command == 'ingest':
+        data = read_dataset(args.records)
+        tenants = data[args.tenant_column].tolist() if args.tenant_column else None
+        added, changed = store.upsert_many(data[args.id_column].tolist(),
+                                           data[FEATURE_COLUMNS].to_dict('records'), tenants)
+        print(f"{added} new and {changed} changed rows of {len(data)}")
+    if args.command in ('ingest', 'rescore'):
+        orphaned = store.orphaned(tenant_table)
+        scored = store.rescore(tenant_table)
+        print(f"Scored {scored} rows, skipped {len(store) - scored - len(orphaned)} unchanged rows")
+        if len(orphaned):
+            tenants = sorted(set(np.char.decode(store.tenants[orphaned], 'utf-8')))
+            print(f"Skipped {len(orphaned)} rows of tenants not in the bundle: {', '.join(tenants)}")
+    elif args.command == 'show':
+        print(json.dumps(store.get(args.record_id, args.tenant), indent=2))
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
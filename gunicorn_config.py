@@ -55,4 +55,9 @@ def post_worker_init(worker):
     worker.log.info("Worker initialized (pid: %s)", worker.pid)
 
 def worker_abort(worker):
-    worker.log.info("Worker aborted (pid: %s)", worker.pid) 
\ No newline at end of file
+    worker.log.info("Worker aborted (pid: %s)", worker.pid)
+
+def worker_exit(server, worker):
+    # Persist the worker's drift sketch before it is recycled
+    from web_app.app import drift_monitor
+    drift_monitor.flush() 
\ No newline at end of file
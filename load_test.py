@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Load generator and capacity report for the Obesity Prediction service.
+
+Sends open-loop traffic (Poisson arrivals at a fixed offered rate, independent
+of response times) to a running instance, sweeps the offered rate and reports
+the maximum sustainable RPS at a p99 latency target, the saturation point and
+error rates. Latency is measured from each request's scheduled send time, so
+time spent queued behind a saturated server is counted.
+
+Usage:
+    # Against a running local or staging instance
+    python load_test.py --url http://staging:5000 --rates 10 20 50 100
+
+    # Start local gunicorn for every worker count / worker class combination
+    python load_test.py --workers 1 2 4 --worker-classes sync gthread
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(__file__))
+from config import CATEGORICAL_MAPPINGS
+
+# Numerical field domains from the form (full.html / static/js/app.js)
+NUMERIC_DOMAINS = {
+    'age': (14, 70, 1),
+    'height': (145, 200, 0.1),
+    'weight': (40, 170, 0.1),
+    'fcvc': (1, 3, 1),
+    'ncp': (1, 4, 1),
+    'ch2o': (1, 5, 0.5),
+    'faf': (0, 3, 1),
+    'tue': (0, 2, 1)
+}
+
+# Records per request for the batch endpoint
+BATCH_SIZE = 50
+
+DEFAULT_MIX = {'predict': 0.8, 'home': 0.1, 'score': 0.05, 'whatif': 0.05}
+
+# A rate is sustainable if p99 and the error rate stay within target and the
+# server completes requests at least this fast relative to how they were sent
+MAX_ERROR_RATE = 0.01
+MIN_THROUGHPUT_RATIO = 0.95
+
+
+def make_payload(rng):
+    """A random form submission drawn from the form's value domains."""
+    payload = {}
+    for field, (low, high, step) in NUMERIC_DOMAINS.items():
+        value = low + step * rng.randint(0, int(round((high - low) / step)))
+        payload[field] = f'{value:g}'
+    for field, mapping in CATEGORICAL_MAPPINGS.items():
+        payload[field] = rng.choice(list(mapping))
+    return payload
+
+
+def make_request(base_url, endpoint, rng):
+    """Build the urllib request for one call to ``endpoint``."""
+    if endpoint == 'home':
+        return urllib.request.Request(base_url + '/')
+    if endpoint == 'predict':
+        body = urllib.parse.urlencode(make_payload(rng)).encode()
+        return urllib.request.Request(base_url + '/predict', data=body)
+
+    if endpoint == 'score':
+        body = {'records': [make_payload(rng) for _ in range(BATCH_SIZE)]}
+        path = '/api/score'
+    elif endpoint == 'whatif':
+        body = {'profile': make_payload(rng),
+                'adjustments': {'faf': [0, 1, 2, 3], 'ch2o': [1, 2, 3, 4, 5]}}
+        path = '/api/whatif'
+    else:
+        raise ValueError(f"Unknown endpoint: {endpoint}")
+    return urllib.request.Request(base_url + path, data=json.dumps(body).encode(),
+                                  headers={'Content-Type': 'application/json'})
+
+
+def send(request, timeout):
+    """Send one request; returns the HTTP status (0 for connection errors)."""
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError):
+        return 0
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list (0.0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def run_open_loop(base_url, rate, duration, mix=None, seed=0, max_inflight=256, timeout=10.0):
+    """Offer ``rate`` requests/s for ``duration`` seconds and summarise the results."""
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    endpoints, weights = zip(*mix.items())
+
+    # Pre-build the arrival schedule and payloads so generation does not delay sends
+    schedule, t = [], rng.expovariate(rate)
+    while t < duration:
+        endpoint = rng.choices(endpoints, weights)[0]
+        schedule.append((t, endpoint, make_request(base_url, endpoint, rng)))
+        t += rng.expovariate(rate)
+
+    results = []
+    lock = threading.Lock()
+
+    def task(scheduled, endpoint, request):
+        status = send(request, timeout)
+        finished = time.perf_counter()
+        with lock:
+            results.append((endpoint, status, finished - scheduled, finished))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_inflight) as executor:
+        for offset, endpoint, request in schedule:
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(task, start + offset, endpoint, request)
+
+    elapsed = max((r[3] for r in results), default=start) - start
+    sent_over = schedule[-1][0] if schedule else 0.0
+    latencies = [r[2] for r in results]
+    errors = [r for r in results if not 200 <= r[1] < 400]
+    return {
+        'offered_rps': rate,
+        'requests': len(results),
+        'sent_rps': len(schedule) / sent_over if sent_over > 0 else 0.0,
+        'achieved_rps': len(results) / elapsed if elapsed > 0 else 0.0,
+        'error_rate': len(errors) / len(results) if results else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1e3,
+        'p95_ms': percentile(latencies, 95) * 1e3,
+        'p99_ms': percentile(latencies, 99) * 1e3,
+        'errors_by_endpoint': {
+            endpoint: sum(1 for r in errors if r[0] == endpoint) for endpoint in mix
+        }
+    }
+
+
+def capacity(steps, p99_target_ms):
+    """Max sustainable RPS and saturation point of a sweep (ordered by rate)."""
+    sustainable, saturation = None, None
+    for step in steps:
+        ok = (step['p99_ms'] <= p99_target_ms
+              and step['error_rate'] <= MAX_ERROR_RATE
+              and step['achieved_rps'] >= MIN_THROUGHPUT_RATIO * step['sent_rps'])
+        if ok and saturation is None:
+            sustainable = step['offered_rps']
+        elif not ok and saturation is None:
+            saturation = step['offered_rps']
+    return {'max_sustainable_rps': sustainable, 'saturation_rps': saturation}
+
+
+def sweep(base_url, rates, duration, p99_target_ms, **kwargs):
+    """Run one open-loop step per rate and compute the capacity summary."""
+    steps = []
+    for rate in sorted(rates):
+        step = run_open_loop(base_url, rate, duration, **kwargs)
+        print(f"  {rate:>7g} rps offered: {step['achieved_rps']:7.1f} achieved, "
+              f"p99 {step['p99_ms']:8.1f} ms, errors {step['error_rate']:.1%}")
+        steps.append(step)
+    return {'steps': steps, **capacity(steps, p99_target_ms)}
+
+
+def start_gunicorn(workers, worker_class, port, threads, state_dir):
+    """Start a local gunicorn and wait until it answers.
+
+    Drift sketches and the feature store go to ``state_dir`` so synthetic
+    traffic never mixes with a real deployment's state on the same host.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind(('127.0.0.1', port))
+        except OSError:
+            raise RuntimeError(f"Port {port} is already in use, pick another with --port")
+
+    env = dict(os.environ,
+               DRIFT_DIR=os.path.join(state_dir, 'drift'),
+               FEATURE_STORE_PATH=os.path.join(state_dir, 'feature_store.bin'))
+    command = [
+        sys.executable, '-m', 'gunicorn', 'web_app.app:app',
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+        '--worker-class', worker_class, '--log-level', 'warning'
+    ]
+    # gunicorn silently switches sync workers to gthread when threads > 1
+    if worker_class == 'gthread':
+        command += ['--threads', str(threads)]
+    process = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        if process.poll() is not None:
+            break
+        if send(urllib.request.Request(url + '/'), timeout=1) == 200:
+            return process, url
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"gunicorn ({workers} x {worker_class}) did not start")
+
+
+def format_report(runs, p99_target_ms):
+    """Render the capacity results as a Markdown table."""
+    lines = [
+        f'Capacity at p99 <= {p99_target_ms:g} ms, errors <= {MAX_ERROR_RATE:.0%}',
+        '',
+        '| Target | Max sustainable RPS | Saturation RPS | Max error rate |',
+        '|---|---|---|---|'
+    ]
+    for name, result in runs.items():
+        max_errors = max((step['error_rate'] for step in result['steps']), default=0.0)
+        lines.append(f"| {name} | {result['max_sustainable_rps'] or '-'} "
+                     f"| {result['saturation_rps'] or '-'} | {max_errors:.1%} |")
+    return '\n'.join(lines)
+
+
+def main():
+    """Sweep the offered load against one URL or several local gunicorn setups."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='Base URL of a running instance')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2],
+                        help='gunicorn worker counts to start locally (ignored with --url)')
+    parser.add_argument('--worker-classes', nargs='+', default=['sync'],
+                        help='gunicorn worker classes to start locally (ignored with --url)')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per gthread worker')
+    parser.add_argument('--port', type=int, default=5055, help='Port for local gunicorn')
+    parser.add_argument('--rates', type=float, nargs='+', default=[5, 10, 20, 50, 100, 200],
+                        help='Offered request rates (requests/s) to sweep')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds per rate')
+    parser.add_argument('--p99', type=float, default=500, help='p99 latency target (ms)')
+    parser.add_argument('--mix', type=json.loads, default=DEFAULT_MIX,
+                        help='Endpoint weights as JSON, e.g. \'{"predict": 1}\'')
+    parser.add_argument('--output', help='Write the full results as JSON')
+    args = parser.parse_args()
+
+    runs = {}
+    if args.url:
+        print(f"Sweeping {args.url}")
+        runs[args.url] = sweep(args.url.rstrip('/'), args.rates, args.duration, args.p99, mix=args.mix)
+    else:
+        for worker_class in args.worker_classes:
+            for workers in args.workers:
+                name = f'{workers} x {worker_class}'
+                print(f"Sweeping local gunicorn ({name})")
+                with tempfile.TemporaryDirectory(prefix='obesity-load-test-') as state_dir:
+                    process, url = start_gunicorn(workers, worker_class, args.port, args.threads,
+                                                  state_dir)
+                    try:
+                        runs[name] = sweep(url, args.rates, args.duration, args.p99, mix=args.mix)
+                    finally:
+                        process.terminate()
+                        process.wait()
+
+    print()
+    print(format_report(runs, args.p99))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(runs, fh, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
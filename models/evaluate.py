@@ -0,0 +1,270 @@
+"""
+Evaluation harness for the Obesity Prediction scorers.
+
+Runs every registered scorer over the same stratified folds in parallel,
+records accuracy, macro-F1 and per-class recall, then measures single-row
+latency, batch throughput and artifact size/load time, and reports which
+scorers are Pareto-optimal on accuracy versus latency.
+
+With ``--calibrate`` it instead fits the confidence temperature of the
+rule-based scorer on a held-out fold and writes ``models/calibration.json``.
+
+Usage:
+    python -m models.evaluate path/to/trained.xlsx --folds 5 --jobs 4
+    python -m models.evaluate path/to/trained.xlsx --calibrate
+"""
+
+import argparse
+import functools
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import OBESITY_LABELS
+from models.scoring import (score_features, risk_scores, score_logits, fit_temperature,
+                            save_calibration)
+
+NUM_CLASSES = len(OBESITY_LABELS)
+
+# Number of rows timed one at a time for the single-row latency
+LATENCY_SAMPLES = 200
+
+SCORERS = {}
+
+# Notebook scorers that could not be registered (scikit-learn missing)
+SKIPPED_SCORERS = []
+
+
+def register_scorer(name, factory):
+    """Register a scorer factory returning an object with ``fit`` and ``predict``."""
+    SCORERS[name] = factory
+
+
+class RuleBasedScorer:
+    """The production BMI/lifestyle heuristic (nothing to fit)."""
+
+    def fit(self, X, y):
+        return self
+
+    def predict(self, X):
+        return score_features(X)['labels']
+
+
+register_scorer('rule_based', RuleBasedScorer)
+
+# The notebook models are only available when scikit-learn is installed
+try:
+    from sklearn.naive_bayes import GaussianNB
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import SVC
+    from sklearn.tree import DecisionTreeClassifier
+
+    register_scorer('gaussian_nb', GaussianNB)
+    register_scorer('svc', lambda: make_pipeline(StandardScaler(), SVC()))
+    register_scorer('decision_tree', functools.partial(DecisionTreeClassifier, random_state=42))
+    register_scorer('mlp', lambda: make_pipeline(
+        StandardScaler(),
+        MLPClassifier(hidden_layer_sizes=(128, 64, 32, 16), max_iter=500, random_state=42)
+    ))
+except ImportError:
+    SKIPPED_SCORERS.extend(['gaussian_nb', 'svc', 'decision_tree', 'mlp'])
+
+
+def stratified_folds(y, n_folds=5, seed=42):
+    """Assign each row to a fold, keeping class proportions per fold."""
+    rng = np.random.default_rng(seed)
+    folds = np.empty(len(y), dtype=int)
+    for label in np.unique(y):
+        index = rng.permutation(np.flatnonzero(y == label))
+        folds[index] = np.arange(len(index)) % n_folds
+    return folds
+
+
+def classification_metrics(y_true, y_pred):
+    """Accuracy, macro-F1 and per-class recall from a confusion matrix."""
+    y_true = np.asarray(y_true, dtype=int)
+    y_pred = np.asarray(y_pred, dtype=int)
+    confusion = np.bincount(y_true * NUM_CLASSES + y_pred,
+                            minlength=NUM_CLASSES ** 2).reshape(NUM_CLASSES, NUM_CLASSES)
+
+    hits = np.diag(confusion).astype(float)
+    support = confusion.sum(axis=1)
+    predicted = confusion.sum(axis=0)
+    recall = np.divide(hits, support, out=np.zeros(NUM_CLASSES), where=support > 0)
+    precision = np.divide(hits, predicted, out=np.zeros(NUM_CLASSES), where=predicted > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall,
+                   out=np.zeros(NUM_CLASSES), where=precision + recall > 0)
+
+    present = support > 0
+    return {
+        'accuracy': float(hits.sum() / len(y_true)),
+        'macro_f1': float(f1[present].mean()),
+        'recall': recall.tolist()
+    }
+
+
+def run_fold(name, X, y, folds, fold):
+    """Fit and score one scorer on one fold (runs in a worker process)."""
+    train, test = folds != fold, folds == fold
+    model = SCORERS[name]().fit(X[train], y[train])
+    metrics = classification_metrics(y[test], model.predict(X[test]))
+    artifact = pickle.dumps(model) if fold == 0 else None
+    return name, fold, metrics, artifact
+
+
+def measure_cost(artifact, X):
+    """Measure artifact size/load time, single-row latency and batch throughput."""
+    start = time.perf_counter()
+    model = pickle.loads(artifact)
+    load_time = time.perf_counter() - start
+
+    latencies = []
+    for row in X[:LATENCY_SAMPLES]:
+        start = time.perf_counter()
+        model.predict(row.reshape(1, -1))
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    model.predict(X)
+    batch_time = time.perf_counter() - start
+
+    return {
+        'artifact_bytes': len(artifact),
+        'load_ms': load_time * 1e3,
+        'latency_p50_ms': float(np.percentile(latencies, 50) * 1e3),
+        'latency_p99_ms': float(np.percentile(latencies, 99) * 1e3),
+        'throughput_rows_per_s': len(X) / batch_time if batch_time > 0 else float('inf')
+    }
+
+
+def pareto_front(results, quality='macro_f1', cost='latency_p50_ms'):
+    """Names of scorers not dominated on (higher quality, lower cost)."""
+    front = []
+    for name, result in results.items():
+        dominated = any(
+            other[quality] >= result[quality] and other[cost] <= result[cost]
+            and (other[quality] > result[quality] or other[cost] < result[cost])
+            for other_name, other in results.items() if other_name != name
+        )
+        if not dominated:
+            front.append(name)
+    return front
+
+
+def evaluate(X, y, scorers=None, n_folds=5, jobs=None, seed=42):
+    """Cross-validate the scorers in parallel and measure their inference cost.
+
+    Accuracy metrics are computed in worker processes; the cost measurements
+    run afterwards in this process, one scorer at a time, so they are not
+    skewed by the parallel fits.
+    """
+    scorers = list(scorers or SCORERS)
+    folds = stratified_folds(y, n_folds, seed)
+    tasks = [(name, fold) for name in scorers for fold in range(n_folds)]
+
+    if jobs == 1:
+        outputs = [run_fold(name, X, y, folds, fold) for name, fold in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(run_fold, name, X, y, folds, fold) for name, fold in tasks]
+            outputs = [future.result() for future in futures]
+
+    fold_metrics = {name: [] for name in scorers}
+    artifacts = {}
+    for name, fold, metrics, artifact in outputs:
+        fold_metrics[name].append(metrics)
+        if artifact is not None:
+            artifacts[name] = artifact
+
+    results = {}
+    for name in scorers:
+        metrics = fold_metrics[name]
+        accuracy = [m['accuracy'] for m in metrics]
+        macro_f1 = [m['macro_f1'] for m in metrics]
+        results[name] = {
+            'accuracy': float(np.mean(accuracy)),
+            'accuracy_std': float(np.std(accuracy)),
+            'macro_f1': float(np.mean(macro_f1)),
+            'macro_f1_std': float(np.std(macro_f1)),
+            'recall': dict(zip(OBESITY_LABELS.values(),
+                               np.mean([m['recall'] for m in metrics], axis=0).round(4).tolist())),
+            **measure_cost(artifacts[name], X[folds == 0])
+        }
+
+    front = pareto_front(results)
+    for name, result in results.items():
+        result['pareto'] = name in front
+    return results
+
+
+def calibrate(X, y, n_folds=5, seed=42):
+    """Fit the rule-based scorer's temperature on one held-out stratified fold."""
+    holdout = stratified_folds(y, n_folds, seed) == 0
+    logits, _ = score_logits(risk_scores(X[holdout]))
+    temperature, nll = fit_temperature(logits, y[holdout])
+    return {'temperature': temperature, 'nll': nll, 'samples': int(holdout.sum())}
+
+
+def format_report(results):
+    """Render the evaluation results as a Markdown table."""
+    lines = [
+        '| Scorer | Accuracy | Macro-F1 | p50 latency (ms) | Throughput (rows/s) '
+        '| Artifact (KB) | Load (ms) | Pareto |',
+        '|---|---|---|---|---|---|---|---|'
+    ]
+    ranked = sorted(results.items(), key=lambda item: -item[1]['macro_f1'])
+    for name, r in ranked:
+        lines.append(
+            f"| {name} | {r['accuracy']:.3f} ± {r['accuracy_std']:.3f} "
+            f"| {r['macro_f1']:.3f} ± {r['macro_f1_std']:.3f} | {r['latency_p50_ms']:.3f} "
+            f"| {r['throughput_rows_per_s']:,.0f} | {r['artifact_bytes'] / 1024:.1f} "
+            f"| {r['load_ms']:.2f} | {'yes' if r['pareto'] else ''} |"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    """Evaluate the registered scorers on a labelled dataset."""
+    from data.dataset import load_dataset
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('dataset', help='Labelled dataset (.xlsx or .csv)')
+    parser.add_argument('--folds', type=int, default=5, help='Number of folds')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes')
+    parser.add_argument('--scorers', nargs='+', choices=sorted(SCORERS), help='Scorers to run')
+    parser.add_argument('--output', help='Write the full results as JSON')
+    parser.add_argument('--calibrate', action='store_true',
+                        help='Fit and store the confidence temperature instead of evaluating')
+    args = parser.parse_args()
+
+    X, y = load_dataset(args.dataset)
+    if args.calibrate:
+        calibration = calibrate(X, y, args.folds)
+        save_calibration(**calibration)
+        print(f"Temperature {calibration['temperature']:.4f} (NLL {calibration['nll']:.4f} "
+              f"on {calibration['samples']} held-out rows) written to models/calibration.json")
+        return
+
+    if SKIPPED_SCORERS:
+        print(f"Warning: scikit-learn is not installed, skipping {', '.join(SKIPPED_SCORERS)}",
+              file=sys.stderr)
+
+    results = evaluate(X, y, args.scorers, args.folds, args.jobs)
+    print(format_report(results))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+"""
+Vectorized scoring for the Obesity Prediction project.
+
+Batch version of the BMI and lifestyle heuristic behind ``simple_prediction``
+that returns the full probability vector over ``OBESITY_LABELS``, the top-k
+classes and a temperature-calibrated confidence for every record.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from config import OBESITY_LABELS, NUMERICAL_COLUMNS, CATEGORICAL_MAPPINGS, FEATURE_COLUMNS
+from config import CALIBRATION_PATH, DEFAULT_TOP_K, LOW_CONFIDENCE_THRESHOLD
+from config import WHATIF_FIELDS, WHATIF_DOMAINS, MAX_WHATIF_VARIANTS
+
+# Column index of every encoded feature
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+# BMI contribution: upper BMI bounds and the risk assigned to each band
+BMI_CUTS = np.array([18.5, 25.0, 30.0, 35.0, 40.0])
+BMI_RISK = np.array([0.1, 0.2, 0.6, 0.8, 0.9, 1.0])
+
+# Blend of BMI risk and lifestyle score
+BMI_WEIGHT = 0.4
+LIFESTYLE_WEIGHT = 0.6
+
+# Weight of each column returned by ``lifestyle_factors``
+LIFESTYLE_FACTORS = [
+    'age_over_50', 'age_over_30', 'family_history', 'high_caloric_food', 'low_vegetables',
+    'few_meals', 'snacking', 'smoking', 'low_water', 'low_activity', 'technology_use',
+    'passive_transport'
+]
+LIFESTYLE_FACTOR_WEIGHTS = np.array([0.2, 0.1, 0.3, 0.2, 0.1, 0.1, 0.2, 0.1, 0.05, 0.15, 0.1, 0.1])
+
+# Final score cut-offs between consecutive OBESITY_LABELS
+# (the 0.5-0.7 "Overweight" band is split into Level I and Level II)
+CATEGORY_THRESHOLDS = np.array([0.3, 0.5, 0.6, 0.7, 0.85, 0.95])
+
+# Distance (in final score units) that costs one logit outside a category band
+DISTANCE_SCALE = 0.05
+
+LABEL_NAMES = [OBESITY_LABELS[i] for i in range(len(OBESITY_LABELS))]
+
+# Numerical fields that must be strictly positive (BMI divides by height)
+POSITIVE_COLUMNS = ['age', 'height', 'weight']
+
+
+def encode_records(records):
+    """Encode form records (dicts of strings) into a float feature matrix."""
+    data = pd.DataFrame.from_records(list(records))
+    missing = [col for col in FEATURE_COLUMNS if col not in data]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+    encoded = np.empty((len(data), len(FEATURE_COLUMNS)), dtype=float)
+    for col in NUMERICAL_COLUMNS:
+        encoded[:, FEATURE_INDEX[col]] = check_numeric(col, data[col].astype(float).to_numpy())
+    for col, mapping in CATEGORICAL_MAPPINGS.items():
+        values = data[col].map(mapping)
+        unknown = data[col][values.isnull()].unique()
+        if len(unknown):
+            raise ValueError(f"Unknown values for {col}: {', '.join(map(str, unknown))}")
+        encoded[:, FEATURE_INDEX[col]] = values.astype(float).to_numpy()
+    return encoded
+
+
+def check_numeric(column, values):
+    """Reject non-finite, negative and (for ``POSITIVE_COLUMNS``) zero values."""
+    values = np.asarray(values, dtype=float)
+    valid = np.isfinite(values) & (values > 0 if column in POSITIVE_COLUMNS else values >= 0)
+    if not valid.all():
+        invalid = ', '.join(f'{value:g}' for value in np.unique(values[~valid]))
+        raise ValueError(f"Invalid values for {column}: {invalid}")
+    return values
+
+
+def encode_values(column, values):
+    """Encode a list of raw values for a single feature column."""
+    mapping = CATEGORICAL_MAPPINGS.get(column)
+    if mapping is None:
+        return check_numeric(column, values)
+    unknown = [value for value in values if value not in mapping]
+    if unknown:
+        raise ValueError(f"Unknown values for {column}: {', '.join(map(str, unknown))}")
+    return np.array([mapping[value] for value in values], dtype=float)
+
+
+def expand_grid(base, adjustments):
+    """Expand one encoded profile and a grid of adjustments into a batch.
+
+    Returns the batch (one row per grid point, in C order over the adjusted
+    fields) and the grid shape.
+    """
+    fields = list(adjustments)
+    if not fields:
+        raise ValueError("Adjust at least one field")
+    invalid = [field for field in fields if field not in WHATIF_FIELDS]
+    if invalid:
+        raise ValueError(f"Fields cannot be adjusted: {', '.join(invalid)}")
+
+    axes = []
+    for field in fields:
+        values = adjustments[field]
+        if not isinstance(values, (list, tuple)) or not all(
+                isinstance(value, (str, int, float)) and not isinstance(value, bool)
+                for value in values):
+            raise ValueError(f"Values for {field} must be a list of numbers or strings")
+        axis = encode_values(field, values)
+        low, high = WHATIF_DOMAINS.get(field, (-np.inf, np.inf))
+        if np.any((axis < low) | (axis > high)):
+            raise ValueError(f"Values for {field} must be between {low:g} and {high:g}")
+        axes.append(axis)
+
+    shape = tuple(len(axis) for axis in axes)
+    size = int(np.prod(shape))
+    if size == 0:
+        raise ValueError("Every adjusted field needs at least one value")
+    if size > MAX_WHATIF_VARIANTS:
+        raise ValueError(f"Grid has {size} variants, the limit is {MAX_WHATIF_VARIANTS}")
+
+    batch = np.repeat(np.asarray(base, dtype=float).reshape(1, -1), size, axis=0)
+    for field, grid in zip(fields, np.meshgrid(*axes, indexing='ij')):
+        batch[:, FEATURE_INDEX[field]] = grid.ravel()
+    return batch, shape
+
+
+def lifestyle_factors(X):
+    """Lifestyle risk factors of ``simple_prediction``, one column per factor."""
+    col = lambda name: X[:, FEATURE_INDEX[name]]
+    age = col('age')
+    return np.column_stack([
+        age > 50,
+        (age > 30) & (age <= 50),
+        col('family_history_with_overweight') == 1,
+        col('favc') == 1,
+        3 - col('fcvc'),
+        col('ncp') < 2,
+        col('caec') > 1,
+        col('smoke') == 1,
+        5 - col('ch2o'),
+        3 - col('faf'),
+        3 - col('tue'),
+        col('mtrans') > 2
+    ]).astype(float)
+
+
+def risk_scores(X, bmi_weight=BMI_WEIGHT, lifestyle_weight=LIFESTYLE_WEIGHT,
+                factor_weights=LIFESTYLE_FACTOR_WEIGHTS):
+    """Vectorized risk score of ``simple_prediction`` for an encoded matrix.
+
+    The weights may be scalars/1-D (shared by every row) or carry a leading
+    per-row axis, e.g. when rows belong to different tenants.
+    """
+    bmi = X[:, FEATURE_INDEX['weight']] / (X[:, FEATURE_INDEX['height']] / 100) ** 2
+    bmi_risk = BMI_RISK[np.searchsorted(BMI_CUTS, bmi, side='right')]
+    lifestyle = (lifestyle_factors(X) * factor_weights).sum(axis=1)
+    return bmi_risk * bmi_weight + lifestyle * lifestyle_weight
+
+
+def score_logits(scores, thresholds=CATEGORY_THRESHOLDS):
+    """Turn final scores into per-class logits and the thresholded class index.
+
+    Each class logit is minus the distance from the score to that class's band,
+    so the band containing the score always has the highest logit. The
+    thresholds may be shared (1-D) or given per row (2-D).
+    """
+    scores = np.asarray(scores, dtype=float)
+    thresholds = np.broadcast_to(thresholds, (len(scores), np.shape(thresholds)[-1]))
+    edges = np.full((len(scores), 1), np.inf)
+    lower = np.hstack((-edges, thresholds))
+    upper = np.hstack((thresholds, edges))
+    distance = (np.maximum(lower - scores[:, None], 0)
+                + np.maximum(scores[:, None] - upper, 0))
+
+    labels = (scores[:, None] >= thresholds).sum(axis=1)
+    # Break ties on band edges in favour of the thresholded class
+    distance = np.maximum(distance, 1e-9)
+    distance[np.arange(len(scores)), labels] = 0.0
+    return -distance / DISTANCE_SCALE, labels
+
+
+def softmax(logits, temperature=1.0):
+    """Row-wise softmax of ``logits / temperature``."""
+    z = np.asarray(logits, dtype=float) / temperature
+    z = z - z.max(axis=1, keepdims=True)
+    exp = np.exp(z)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def fit_temperature(logits, targets, grid=None):
+    """Fit the temperature minimising negative log-likelihood on a held-out set."""
+    if grid is None:
+        grid = np.logspace(-2, 2, 200)
+    targets = np.asarray(targets, dtype=int)
+    rows = np.arange(len(targets))
+
+    best_temperature, best_nll = 1.0, np.inf
+    for temperature in grid:
+        probabilities = softmax(logits, temperature)
+        nll = -np.mean(np.log(probabilities[rows, targets] + 1e-12))
+        if nll < best_nll:
+            best_temperature, best_nll = float(temperature), float(nll)
+    return best_temperature, best_nll
+
+
+def save_calibration(temperature, path=CALIBRATION_PATH, **metadata):
+    """Store the fitted temperature next to the model artifact."""
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump({'method': 'temperature', 'temperature': temperature, **metadata}, fh, indent=2)
+
+
+def load_calibration(path=CALIBRATION_PATH):
+    """Load the stored temperature, falling back to 1.0 (uncalibrated)."""
+    if not os.path.exists(path):
+        return 1.0
+    with open(path, 'r', encoding='utf-8') as fh:
+        return float(json.load(fh).get('temperature', 1.0))
+
+
+TEMPERATURE = load_calibration()
+
+
+def score_features(X, top_k=DEFAULT_TOP_K, temperature=None,
+                   threshold=LOW_CONFIDENCE_THRESHOLD, params=None):
+    """Score an encoded feature matrix in a single vectorized pass.
+
+    ``params`` optionally overrides ``bmi_weight``, ``lifestyle_weight``,
+    ``factor_weights`` and ``thresholds``, shared or per row.
+    """
+    if temperature is None:
+        temperature = TEMPERATURE
+    params = dict(params or {})
+    thresholds = params.pop('thresholds', CATEGORY_THRESHOLDS)
+    scores = risk_scores(X, **params)
+    logits, labels = score_logits(scores, thresholds)
+    probabilities = softmax(logits, temperature)
+
+    return {'scores': scores, **summarise(probabilities, labels, top_k, threshold)}
+
+
+def summarise(probabilities, labels, top_k=DEFAULT_TOP_K, threshold=LOW_CONFIDENCE_THRESHOLD):
+    """Top-k classes, confidence and low-confidence flags for class probabilities."""
+    top_k = max(1, min(int(top_k), probabilities.shape[1]))
+    top = np.argsort(-probabilities, axis=1, kind='stable')[:, :top_k]
+    confidence = probabilities[np.arange(len(labels)), labels]
+    return {
+        'labels': labels,
+        'probabilities': probabilities,
+        'top_k': top,
+        'confidence': confidence,
+        'low_confidence': confidence < threshold
+    }
+
+
+def score_records(records, **kwargs):
+    """Encode and score a list of form records."""
+    return score_features(encode_records(records), **kwargs)
+
+
+def score_grid(profile, adjustments, score=None, **kwargs):
+    """Score every combination of lifestyle adjustments to one profile.
+
+    ``score`` replaces ``score_features``, e.g. with a tenant's scorer.
+    """
+    batch, shape = expand_grid(encode_records([profile])[0], adjustments)
+    result = (score or score_features)(batch, **kwargs)
+    return {
+        'fields': list(adjustments),
+        'values': {field: list(values) for field, values in adjustments.items()},
+        'shape': list(shape),
+        'labels': LABEL_NAMES,
+        'categories': result['labels'].reshape(shape).tolist(),
+        'confidence': np.round(result['confidence'], 4).reshape(shape).tolist()
+    }
+
+
+def format_predictions(result):
+    """Convert a ``score_features`` result into JSON-serialisable records."""
+    predictions = []
+    for i, label in enumerate(result['labels']):
+        probabilities = result['probabilities'][i]
+        predictions.append({
+            'prediction': LABEL_NAMES[label],
+            'confidence': round(float(result['confidence'][i]), 4),
+            'low_confidence': bool(result['low_confidence'][i]),
+            'top_k': [
+                {'label': LABEL_NAMES[k], 'probability': round(float(probabilities[k]), 4)}
+                for k in result['top_k'][i]
+            ],
+            'probabilities': dict(zip(LABEL_NAMES, np.round(probabilities, 4).tolist()))
+        })
+    return predictions
@@ -0,0 +1,164 @@
+"""
+Tenant-scoped scoring profiles for the Obesity Prediction project.
+
+Clinics can override the heuristic's BMI/lifestyle blend, the lifestyle factor
+weights and the category cut-offs, or use their own model, through a
+versioned JSON bundle at ``TENANTS_PATH``:
+
+    {
+      "version": "2026.10.1",
+      "tenants": {
+        "clinic-a": {
+          "bmi_weight": 0.5,
+          "lifestyle_weight": 0.5,
+          "thresholds": [0.3, 0.45, 0.6, 0.7, 0.85, 0.95],
+          "factor_weights": {"family_history": 0.4},
+          "model": "clinic-a.pkl"
+        }
+      }
+    }
+
+Omitted settings fall back to the defaults in ``models.scoring``. ``model`` is
+a pickled scorer (e.g. a fold-0 artifact from ``models.evaluate``) relative to
+the bundle. At load time every setting is compiled into one array indexed by
+tenant, so a mixed-tenant batch is scored in a single pass by gathering the
+rows' parameters with their tenant indices.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+
+from config import TENANTS_PATH, DEFAULT_TENANT, OBESITY_LABELS
+from models.scoring import (BMI_WEIGHT, LIFESTYLE_WEIGHT, LIFESTYLE_FACTORS,
+                            LIFESTYLE_FACTOR_WEIGHTS, CATEGORY_THRESHOLDS, BMI_CUTS, BMI_RISK,
+                            TEMPERATURE, score_features, summarise)
+
+TENANT_SETTINGS = ('bmi_weight', 'lifestyle_weight', 'thresholds', 'factor_weights', 'model')
+
+
+class TenantTable:
+    """Tenant scoring profiles compiled into per-tenant parameter arrays."""
+
+    def __init__(self, tenants=None, version=None, base_dir='.'):
+        tenants = dict(tenants or {})
+        # Tenants defined by the bundle (``default`` is always available)
+        self.configured = set(tenants)
+        tenants.setdefault(DEFAULT_TENANT, {})
+        self.version = version
+        self.names = list(tenants)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+        count = len(self.names)
+        self.bmi_weight = np.full(count, BMI_WEIGHT)
+        self.lifestyle_weight = np.full(count, LIFESTYLE_WEIGHT)
+        self.factor_weights = np.tile(LIFESTYLE_FACTOR_WEIGHTS, (count, 1))
+        self.thresholds = np.tile(CATEGORY_THRESHOLDS, (count, 1))
+        self.models = [None] * count
+        self.model_files = [None] * count
+        for name, profile in tenants.items():
+            self._compile(self.index[name], name, profile, base_dir)
+        self.model_versions = [self._fingerprint(i) for i in range(count)]
+
+    def _compile(self, i, name, profile, base_dir):
+        """Validate one tenant profile and write it into row ``i``."""
+        unknown = set(profile) - set(TENANT_SETTINGS)
+        if unknown:
+            raise ValueError(f"Tenant {name}: unknown settings {', '.join(sorted(unknown))}")
+
+        self.bmi_weight[i] = float(profile.get('bmi_weight', BMI_WEIGHT))
+        self.lifestyle_weight[i] = float(profile.get('lifestyle_weight', LIFESTYLE_WEIGHT))
+
+        thresholds = np.asarray(profile.get('thresholds', CATEGORY_THRESHOLDS), dtype=float)
+        if thresholds.shape != CATEGORY_THRESHOLDS.shape or np.any(np.diff(thresholds) <= 0):
+            raise ValueError(f"Tenant {name}: thresholds must be {len(CATEGORY_THRESHOLDS)} "
+                             "increasing cut-offs")
+        self.thresholds[i] = thresholds
+
+        for factor, weight in profile.get('factor_weights', {}).items():
+            if factor not in LIFESTYLE_FACTORS:
+                raise ValueError(f"Tenant {name}: unknown lifestyle factor {factor}")
+            self.factor_weights[i, LIFESTYLE_FACTORS.index(factor)] = float(weight)
+
+        if profile.get('model'):
+            with open(os.path.join(base_dir, profile['model']), 'rb') as fh:
+                self.model_files[i] = fh.read()
+            self.models[i] = pickle.loads(self.model_files[i])
+
+    def _fingerprint(self, i):
+        """Short hash of everything that determines tenant ``i``'s predictions."""
+        digest = hashlib.sha1()
+        for array in (self.bmi_weight[i], self.lifestyle_weight[i], self.factor_weights[i],
+                      self.thresholds[i], BMI_CUTS, BMI_RISK, np.float64(TEMPERATURE)):
+            digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+        digest.update(self.model_files[i] or b'')
+        return digest.hexdigest()[:16]
+
+    def model_version(self, tenant):
+        """Version of the scoring setup of ``tenant``, for caching predictions."""
+        return self.model_versions[self.indices([tenant])[0]]
+
+    def indices(self, tenants):
+        """Tenant index per row; names are resolved once per distinct tenant."""
+        names, inverse = np.unique(np.asarray(tenants, dtype=str), return_inverse=True)
+        unknown = [name for name in names if name not in self.index]
+        if unknown:
+            raise ValueError(f"Unknown tenant: {', '.join(unknown)}")
+        return np.array([self.index[name] for name in names], dtype=int)[inverse]
+
+    def params(self, indices):
+        """Scoring parameters gathered per row for ``score_features``."""
+        return {
+            'bmi_weight': self.bmi_weight[indices],
+            'lifestyle_weight': self.lifestyle_weight[indices],
+            'factor_weights': self.factor_weights[indices],
+            'thresholds': self.thresholds[indices]
+        }
+
+    def score(self, X, indices, top_k=None, threshold=None, **kwargs):
+        """Score a (possibly mixed-tenant) batch in one pass.
+
+        Rows of tenants with their own model are re-scored by that model,
+        one call per model.
+        """
+        options = {k: v for k, v in (('top_k', top_k), ('threshold', threshold)) if v is not None}
+        result = score_features(X, params=self.params(indices), **options, **kwargs)
+
+        overridden = [i for i in np.unique(indices) if self.models[i] is not None]
+        if not overridden:
+            return result
+
+        probabilities = result['probabilities'].copy()
+        for i in overridden:
+            rows = np.flatnonzero(indices == i)
+            probabilities[rows] = model_probabilities(self.models[i], X[rows])
+        labels = probabilities.argmax(axis=1)
+        return {'scores': result['scores'], **summarise(probabilities, labels, **options)}
+
+    def scorer(self, tenant):
+        """A ``score_features``-compatible function bound to one tenant."""
+        i = self.indices([tenant])[0]
+        return lambda X, **kwargs: self.score(X, np.full(len(X), i), **kwargs)
+
+
+def model_probabilities(model, X):
+    """Class probabilities of a tenant model over all ``OBESITY_LABELS``."""
+    probabilities = np.zeros((len(X), len(OBESITY_LABELS)))
+    if hasattr(model, 'predict_proba'):
+        probabilities[:, model.classes_] = model.predict_proba(X)
+    else:
+        probabilities[np.arange(len(X)), model.predict(X)] = 1.0
+    return probabilities
+
+
+def load_tenants(path=TENANTS_PATH):
+    """Load the tenant bundle; only the default tenant exists without one."""
+    if not os.path.exists(path):
+        return TenantTable()
+    with open(path, 'r', encoding='utf-8') as fh:
+        bundle = json.load(fh)
+    return TenantTable(bundle.get('tenants', {}), bundle.get('version'),
+                       base_dir=os.path.dirname(os.path.abspath(path)))
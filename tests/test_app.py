@@ -5,11 +5,15 @@ Basic tests for the Obesity Prediction Flask application.
 import unittest
 import sys
 import os
+import tempfile
 
 # Add the web_app directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'web_app'))
 
+import app as app_module
 from app import app
+from data.feature_store import FeatureStore
+from models.tenants import TenantTable
 
 class TestObesityPredictionApp(unittest.TestCase):
     """Test cases for the Obesity Prediction Flask application."""
@@ -56,5 +60,147 @@ class TestObesityPredictionApp(unittest.TestCase):
         for field in form_fields:
             self.assertIn(field, response.data)
 
+    def test_score_endpoint(self):
+        """Test that the score endpoint returns probabilities and top-k classes."""
+        record = {
+            'gender': 'Male', 'age': '45', 'height': '175', 'weight': '95',
+            'family_history_with_overweight': 'yes', 'favc': 'yes', 'fcvc': '1', 'ncp': '3',
+            'caec': 'Frequently', 'smoke': 'no', 'ch2o': '1.5', 'scc': 'no', 'faf': '0',
+            'tue': '2', 'calc': 'Sometimes', 'mtrans': 'Automobile'
+        }
+        response = self.app.post('/api/score', json={'records': [record, record], 'top_k': 2})
+        self.assertEqual(response.status_code, 200)
+
+        predictions = response.get_json()['predictions']
+        self.assertEqual(len(predictions), 2)
+        self.assertEqual(len(predictions[0]['top_k']), 2)
+        self.assertEqual(len(predictions[0]['probabilities']), 7)
+        self.assertIn('low_confidence', predictions[0])
+
+    def test_whatif_endpoint(self):
+        """Test that the what-if endpoint returns a category matrix."""
+        profile = {
+            'gender': 'Female', 'age': '33', 'height': '160', 'weight': '72',
+            'family_history_with_overweight': 'no', 'favc': 'yes', 'fcvc': '2', 'ncp': '3',
+            'caec': 'Sometimes', 'smoke': 'no', 'ch2o': '2', 'scc': 'no', 'faf': '1',
+            'tue': '1', 'calc': 'no', 'mtrans': 'Walking'
+        }
+        adjustments = {'faf': [0, 1, 2, 3], 'ch2o': [1, 2, 3, 4, 5]}
+        response = self.app.post('/api/whatif', json={'profile': profile, 'adjustments': adjustments})
+        self.assertEqual(response.status_code, 200)
+
+        result = response.get_json()
+        shape = [len(adjustments[field]) for field in result['fields']]
+        self.assertEqual(result['shape'], shape)
+        self.assertEqual(len(result['categories']), shape[0])
+        self.assertEqual(len(result['categories'][0]), shape[1])
+        self.assertIn('prediction', result['base'])
+
+    def test_tenant_selection(self):
+        """Test tenant selection by path prefix and header."""
+        record = {
+            'gender': 'Male', 'age': '45', 'height': '175', 'weight': '95',
+            'family_history_with_overweight': 'yes', 'favc': 'yes', 'fcvc': '1', 'ncp': '3',
+            'caec': 'Frequently', 'smoke': 'no', 'ch2o': '1.5', 'scc': 'no', 'faf': '0',
+            'tue': '2', 'calc': 'Sometimes', 'mtrans': 'Automobile'
+        }
+        response = self.app.post('/t/default/api/score', json=record)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.app.post('/api/score', json=record, headers={'X-Tenant': 'no-such-clinic'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.app.post('/t/no-such-clinic/predict', data=record)
+        self.assertEqual(response.status_code, 404)
+
+        # A record cannot pick another tenant than the path or header
+        response = self.app.post('/t/default/api/score', json=dict(record, tenant='clinic-b'))
+        self.assertEqual(response.status_code, 400)
+        response = self.app.post('/api/score', json=dict(record, tenant='clinic-b'),
+                                 headers={'X-Tenant': 'default'})
+        self.assertEqual(response.status_code, 400)
+        response = self.app.post('/t/default/api/score', json=dict(record, tenant='default'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_bundle_default_applies_to_predict(self):
+        """Test that a default profile in the bundle is used by the form too."""
+        record = {
+            'gender': 'Male', 'age': '45', 'height': '175', 'weight': '95',
+            'family_history_with_overweight': 'yes', 'favc': 'yes', 'fcvc': '1', 'ncp': '3',
+            'caec': 'Frequently', 'smoke': 'no', 'ch2o': '1.5', 'scc': 'no', 'faf': '0',
+            'tue': '2', 'calc': 'Sometimes', 'mtrans': 'Automobile'
+        }
+        original = app_module.tenant_table
+        app_module.tenant_table = TenantTable(
+            {'default': {'thresholds': [10, 11, 12, 13, 14, 15]}})
+        try:
+            response = self.app.post('/predict', data=record)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b'category-insufficient">Insufficient Weight<', response.data)
+        finally:
+            app_module.tenant_table = original
+
+    def test_patient_endpoints(self):
+        """Test storing a patient, a partial update and the cached prediction."""
+        record = {
+            'gender': 'Female', 'age': '33', 'height': '160', 'weight': '72',
+            'family_history_with_overweight': 'no', 'favc': 'yes', 'fcvc': '2', 'ncp': '3',
+            'caec': 'Sometimes', 'smoke': 'no', 'ch2o': '2', 'scc': 'no', 'faf': '1',
+            'tue': '1', 'calc': 'no', 'mtrans': 'Walking'
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            app_module.feature_store = FeatureStore(os.path.join(tmp, 'features.bin'), capacity=10)
+            try:
+                response = self.app.put('/api/patients/p1', json=record)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.get_json()['cached'])
+
+                response = self.app.put('/api/patients/p1', json={'weight': '72'})
+                self.assertTrue(response.get_json()['cached'])
+
+                response = self.app.put('/api/patients/p1', json={'weight': '110'})
+                self.assertFalse(response.get_json()['cached'])
+                self.assertEqual(response.get_json()['features']['weight'], 110.0)
+
+                # A row changed by a bulk ingest is rescored, not served from cache
+                app_module.feature_store.upsert_many(['p1'], [dict(record, weight='60')])
+                response = self.app.put('/api/patients/p1', json={'weight': '60'})
+                self.assertFalse(response.get_json()['cached'])
+                self.assertFalse(response.get_json()['stale'])
+
+                self.assertEqual(self.app.get('/api/patients/p1').status_code, 200)
+                self.assertEqual(self.app.get('/t/default/api/patients/p1').status_code, 200)
+                self.assertEqual(self.app.get('/api/patients/p2').status_code, 404)
+
+                # Another tenant neither sees nor overwrites the patient
+                other = {'X-Tenant': 'clinic-b'}
+                self.assertEqual(self.app.get('/api/patients/p1', headers=other).status_code, 404)
+                self.assertEqual(self.app.get('/t/clinic-b/api/patients/p1').status_code, 404)
+                self.assertEqual(self.app.put('/api/patients/p2', json={'age': '40'}).status_code, 400)
+            finally:
+                app_module.feature_store.close()
+                app_module.feature_store = None
+
+    def test_drift_endpoint(self):
+        """Test that the drift endpoint reports status as JSON."""
+        response = self.app.get('/api/drift')
+        self.assertIn(response.status_code, (200, 503))
+        self.assertIsInstance(response.get_json(), dict)
+
+    def test_score_endpoint_rejects_bad_input(self):
+        """Test that the score endpoint rejects incomplete and invalid records."""
+        response = self.app.post('/api/score', json={'age': '30'})
+        self.assertEqual(response.status_code, 400)
+
+        record = {
+            'gender': 'Female', 'age': '28', 'height': '165', 'weight': '70',
+            'family_history_with_overweight': 'yes', 'favc': 'yes', 'fcvc': '2', 'ncp': '3',
+            'caec': 'Sometimes', 'smoke': 'no', 'ch2o': '2', 'scc': 'no', 'faf': '1',
+            'tue': '1', 'calc': 'no', 'mtrans': 'Public_Transportation'
+        }
+        for field, value in (('gender', 'xyz'), ('age', 'nan'), ('height', '0'), ('faf', '-1')):
+            response = self.app.post('/api/score', json={'records': [dict(record, **{field: value})]})
+            self.assertEqual(response.status_code, 400, field)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
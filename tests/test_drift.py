@@ -0,0 +1,142 @@
+"""
+Tests for drift monitoring sketches.
+"""
+
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add the project root and tests directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from test_scoring import random_record
+from data.drift import (DriftMonitor, build_profile, save_profile, load_profile,
+                        drift_scores)
+
+
+def random_frame(n, seed=0, **overrides):
+    """Random form records as a DataFrame."""
+    rng = random.Random(seed)
+    return pd.DataFrame([dict(random_record(rng), **overrides) for _ in range(n)])
+
+
+class TestDrift(unittest.TestCase):
+    """Test cases for drift sketches and scores."""
+
+    def setUp(self):
+        self.profile = build_profile(random_frame(2000))
+
+    def test_update_matches_batch(self):
+        """Test that per-request updates agree with the batch profile build."""
+        data = random_frame(50, seed=1)
+        batch = self.profile.empty_like()
+        batch.update_batch(data)
+        live = self.profile.empty_like()
+        for record in data.to_dict('records'):
+            live.update(record)
+
+        self.assertEqual(live.counts, batch.counts)
+        self.assertEqual(live.total, 50)
+
+    def test_malformed_records_ignored(self):
+        """Test that bad requests do not break or skew the sketch."""
+        live = self.profile.empty_like()
+        live.update({'age': 'abc'})
+        live.update(dict(random_record(random.Random(2)), age='nan'))
+        live.update(dict(random_record(random.Random(2)), mtrans='Rocket'))
+        self.assertEqual(live.total, 1)
+
+    def test_profile_ignores_missing_values(self):
+        """Test that NaNs in the training data do not collapse the bin edges."""
+        data = random_frame(500, seed=13)
+        data['age'] = data['age'].astype(float)
+        data.loc[0, 'age'] = float('nan')
+        profile = build_profile(data)
+        self.assertGreater(len(profile.edges['age']), 1)
+        self.assertTrue(all(np.isfinite(profile.edges['age'])))
+        self.assertEqual(profile.total, 499)
+
+        data['age'] = float('nan')
+        with self.assertRaises(ValueError):
+            build_profile(data)
+
+    def test_drift_scores(self):
+        """Test that a shifted stream is flagged and a matching one is not."""
+        same = self.profile.empty_like()
+        same.update_batch(random_frame(1000, seed=3))
+        self.assertEqual(drift_scores(self.profile, same)['drifted'], [])
+
+        shifted = self.profile.empty_like()
+        shifted.update_batch(random_frame(1000, seed=4, weight='150', mtrans='Automobile'))
+        report = drift_scores(self.profile, shifted)
+        self.assertIn('weight', report['drifted'])
+        self.assertIn('mtrans', report['drifted'])
+        self.assertGreater(report['columns']['weight']['ks'], 0.5)
+
+    def test_monitor_merges_workers(self):
+        """Test that flushed worker sketches are merged into the report."""
+        with tempfile.TemporaryDirectory() as tmp:
+            profile_path = os.path.join(tmp, 'profile.json')
+            save_profile(self.profile, profile_path)
+            self.assertEqual(load_profile(profile_path).counts, self.profile.counts)
+
+            monitor = DriftMonitor(profile_path, os.path.join(tmp, 'sketches'), flush_interval=0)
+            for record in random_frame(5, seed=5).to_dict('records'):
+                monitor.update(record)
+
+            # A second worker only sees the first one's flushed file
+            other = DriftMonitor(profile_path, monitor.directory)
+            other._path = lambda: os.path.join(monitor.directory, 'other.json')
+            other.update(random_record(random.Random(6)))
+            self.assertEqual(other.report()['samples'], 6)
+
+    def test_monitor_skips_other_profiles(self):
+        """Test that counts flushed under an older profile's bins are not merged."""
+        with tempfile.TemporaryDirectory() as tmp:
+            profile_path = os.path.join(tmp, 'profile.json')
+            save_profile(build_profile(random_frame(2000, seed=8)), profile_path)
+            old = DriftMonitor(profile_path, os.path.join(tmp, 'sketches'), flush_interval=0)
+            old._path = lambda: os.path.join(old.directory, f'w{old.period}-old.json')
+            old.update(random_record(random.Random(9)))
+
+            save_profile(self.profile, profile_path)
+            monitor = DriftMonitor(profile_path, old.directory)
+            monitor.update(random_record(random.Random(10)))
+            self.assertEqual(monitor.report()['samples'], 1)
+
+    def test_monitor_window_rotation(self):
+        """Test that a new window starts empty and removes earlier windows' files."""
+        with tempfile.TemporaryDirectory() as tmp:
+            profile_path = os.path.join(tmp, 'profile.json')
+            save_profile(self.profile, profile_path)
+            monitor = DriftMonitor(profile_path, os.path.join(tmp, 'sketches'), flush_interval=0)
+            monitor._period = lambda: 1
+            monitor.period = 1
+            monitor.update(random_record(random.Random(11)))
+            old_file = monitor._path()
+            self.assertTrue(os.path.exists(old_file))
+
+            monitor._period = lambda: 2
+            monitor.update(random_record(random.Random(12)))
+            self.assertFalse(os.path.exists(old_file))
+            report = monitor.report()
+            self.assertEqual(report['samples'], 1)
+            self.assertEqual(report['window_start'], 2 * monitor.window)
+
+    def test_monitor_disabled_without_profile(self):
+        """Test that the monitor is a no-op without a training profile."""
+        with tempfile.TemporaryDirectory() as tmp:
+            monitor = DriftMonitor(os.path.join(tmp, 'missing.json'), tmp)
+            monitor.update(random_record(random.Random(7)))
+            self.assertFalse(monitor.enabled)
+            self.assertIn('error', monitor.report())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Tests for the model evaluation harness and dataset loading.
+"""
+
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add the project root and tests directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from test_scoring import random_record
+from data.dataset import DATASET_COLUMNS, TARGET_COLUMN, load_dataset
+from models.evaluate import (classification_metrics, stratified_folds, pareto_front,
+                             evaluate, format_report, calibrate)
+from models.scoring import encode_records, score_features
+
+
+def synthetic_dataset(n=300, seed=0):
+    """Random records labelled by the rule-based scorer."""
+    rng = random.Random(seed)
+    X = encode_records([random_record(rng) for _ in range(n)])
+    return X, score_features(X)['labels']
+
+
+class TestEvaluate(unittest.TestCase):
+    """Test cases for the evaluation harness."""
+
+    def test_classification_metrics(self):
+        """Test accuracy, macro-F1 and recall on a known confusion."""
+        metrics = classification_metrics([0, 0, 1, 1], [0, 1, 1, 1])
+        self.assertAlmostEqual(metrics['accuracy'], 0.75)
+        self.assertEqual(metrics['recall'][:2], [0.5, 1.0])
+        self.assertAlmostEqual(metrics['macro_f1'], (2 / 3 + 0.8) / 2)
+
+    def test_stratified_folds(self):
+        """Test that every class is spread evenly across folds."""
+        y = np.repeat(np.arange(3), 10)
+        folds = stratified_folds(y, n_folds=5)
+        for label in range(3):
+            np.testing.assert_array_equal(np.bincount(folds[y == label]), [2] * 5)
+
+    def test_pareto_front(self):
+        """Test that dominated scorers are excluded."""
+        results = {
+            'fast': {'macro_f1': 0.6, 'latency_p50_ms': 0.1},
+            'accurate': {'macro_f1': 0.9, 'latency_p50_ms': 2.0},
+            'dominated': {'macro_f1': 0.5, 'latency_p50_ms': 3.0}
+        }
+        self.assertEqual(pareto_front(results), ['fast', 'accurate'])
+
+    def test_evaluate_rule_based(self):
+        """Test a full evaluation run of the rule-based scorer."""
+        X, y = synthetic_dataset()
+        results = evaluate(X, y, scorers=['rule_based'], n_folds=3, jobs=1)
+
+        result = results['rule_based']
+        self.assertEqual(result['accuracy'], 1.0)
+        self.assertTrue(result['pareto'])
+        self.assertGreater(result['artifact_bytes'], 0)
+        self.assertIn('rule_based', format_report(results))
+
+    def test_calibrate(self):
+        """Test that the temperature is fitted on one held-out fold."""
+        X, y = synthetic_dataset()
+        calibration = calibrate(X, y, n_folds=5)
+        self.assertEqual(calibration['samples'], int((stratified_folds(y, 5) == 0).sum()))
+        self.assertLess(calibration['temperature'], 1.0)
+        self.assertGreaterEqual(calibration['nll'], 0.0)
+
+    def test_load_dataset(self):
+        """Test loading a CSV export of the dataset."""
+        rng = random.Random(1)
+        records = pd.DataFrame([random_record(rng) for _ in range(5)])
+        data = records.rename(columns={v: k for k, v in DATASET_COLUMNS.items()})
+        data['Height'] = data['Height'].astype(float) / 100
+        data[TARGET_COLUMN] = 'Overweight_Level_II'
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trained.csv')
+            data.to_csv(path, index=False)
+            X, y = load_dataset(path)
+
+        np.testing.assert_allclose(X, encode_records(records.to_dict('records')))
+        np.testing.assert_array_equal(y, [3] * 5)
+
+
+    def test_load_dataset_with_missing_values(self):
+        """Test that missing values are imputed and unlabelled rows dropped."""
+        rng = random.Random(2)
+        records = pd.DataFrame([random_record(rng) for _ in range(6)])
+        data = records.rename(columns={v: k for k, v in DATASET_COLUMNS.items()})
+        for column in ('Age', 'Height', 'Weight', 'FAF'):
+            data[column] = data[column].astype(float)
+        data['Height'] = data['Height'] / 100
+        data[TARGET_COLUMN] = 'Normal_Weight'
+        data.loc[0, 'Age'] = np.nan
+        data.loc[1, 'MTRANS'] = np.nan
+        data.loc[5, TARGET_COLUMN] = np.nan
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trained.csv')
+            data.to_csv(path, index=False)
+            X, y = load_dataset(path)
+
+        self.assertEqual(X.shape[0], 5)
+        self.assertTrue(np.isfinite(X).all())
+        self.assertAlmostEqual(X[0, 1], data['Age'].mean())
+        np.testing.assert_array_equal(y, [1] * 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Tests for the memory-mapped feature store.
+"""
+
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+import numpy as np
+
+# Add the project root and tests directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from test_scoring import random_record, SAMPLE_RECORD
+from test_tenants import CLINIC_A
+from data.feature_store import FeatureStore
+from models.scoring import encode_records, score_features, LABEL_NAMES
+from models.tenants import TenantTable
+
+
+class TestFeatureStore(unittest.TestCase):
+    """Test cases for the feature store."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'features.bin')
+        self.store = FeatureStore(self.path, capacity=100)
+        self.table = TenantTable({'clinic-a': CLINIC_A})
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_upsert_and_partial_update(self):
+        """Test that partial updates only mark the row dirty on real changes."""
+        row, changed = self.store.upsert('p1', SAMPLE_RECORD)
+        self.assertTrue(changed)
+        self.assertEqual(self.store.rescore(self.table), 1)
+
+        self.assertEqual(self.store.upsert('p1', {'weight': '70'}), (row, False))
+        self.assertEqual(self.store.rescore(self.table), 0)
+
+        self.assertEqual(self.store.upsert('p1', {'weight': '95'}), (row, True))
+        self.assertEqual(self.store.get('p1')['features']['weight'], 95.0)
+        self.assertTrue(self.store.get('p1')['stale'])
+        self.assertEqual(self.store.rescore(self.table), 1)
+
+        expected = score_features(encode_records([dict(SAMPLE_RECORD, weight='95')]))
+        self.assertEqual(self.store.get('p1')['prediction'], LABEL_NAMES[expected['labels'][0]])
+
+        with self.assertRaises(ValueError):
+            self.store.upsert('p2', {'weight': '80'})
+
+    def test_rejected_partial_update_writes_nothing(self):
+        """Test that an update with one invalid field leaves the row untouched."""
+        row, _ = self.store.upsert('p1', SAMPLE_RECORD)
+        self.store.rescore(self.table)
+
+        with self.assertRaises(ValueError):
+            self.store.upsert('p1', {'age': '65', 'height': '0'})
+        self.assertEqual(self.store.get('p1')['features']['age'], 28.0)
+        self.assertFalse(self.store.get('p1')['stale'])
+        self.assertEqual(self.store.upsert('p1', {'age': '65'}), (row, True))
+
+    def test_bulk_ingest_skips_unchanged_rows(self):
+        """Test that a nightly run only rescores changed rows."""
+        rng = random.Random(0)
+        records = [random_record(rng) for _ in range(50)]
+        ids = [f'patient-{i}' for i in range(50)]
+        self.assertEqual(self.store.upsert_many(ids, records), (50, 0))
+        self.assertEqual(self.store.rescore(self.table), 50)
+
+        records[3] = dict(records[3], faf='3' if records[3]['faf'] != '3' else '0')
+        self.assertEqual(self.store.upsert_many(ids + ['patient-50'], records + [SAMPLE_RECORD]),
+                         (1, 1))
+        self.assertEqual(self.store.rescore(self.table), 2)
+        self.assertEqual(self.store.rescore(self.table), 0)
+
+    def test_model_version_change_triggers_rescore(self):
+        """Test that rows are rescored when their tenant's model changes."""
+        self.store.upsert('p1', SAMPLE_RECORD, tenant='clinic-a')
+        self.store.upsert('p2', SAMPLE_RECORD)
+        self.store.rescore(self.table)
+
+        changed = TenantTable({'clinic-a': dict(CLINIC_A, bmi_weight=0.9)})
+        np.testing.assert_array_equal(self.store.stale(changed), [0])
+
+    def test_unknown_tenants_skipped(self):
+        """Test that rows of tenants removed from the bundle do not abort a rescore."""
+        self.store.upsert('p1', SAMPLE_RECORD, tenant='clinic-a')
+        self.store.upsert('p2', SAMPLE_RECORD)
+
+        table = TenantTable()
+        np.testing.assert_array_equal(self.store.orphaned(table), [0])
+        np.testing.assert_array_equal(self.store.stale(table), [1])
+        self.assertEqual(self.store.rescore(table), 1)
+        self.assertEqual(self.store.rescore(table, rows=np.array([0, 1])), 1)
+        self.assertTrue(self.store.get('p1', 'clinic-a')['stale'])
+
+    def test_tenants_do_not_collide(self):
+        """Test that the same patient ID under two tenants is two separate rows."""
+        row_a, _ = self.store.upsert('p1', SAMPLE_RECORD, tenant='clinic-a')
+        row_b, _ = self.store.upsert('p1', dict(SAMPLE_RECORD, weight='95'))
+        self.assertNotEqual(row_a, row_b)
+        self.assertEqual(self.store.get('p1', 'clinic-a')['features']['weight'], 70.0)
+        self.assertEqual(self.store.get('p1')['features']['weight'], 95.0)
+        self.assertIsNone(self.store.get('p1', 'clinic-b'))
+
+        self.assertEqual(self.store.upsert_many(['p1', 'p1'], [SAMPLE_RECORD] * 2,
+                                                ['clinic-a', 'clinic-b']), (1, 0))
+        self.assertEqual(self.store.get('p1', 'clinic-b')['tenant'], 'clinic-b')
+
+    def test_shared_between_processes(self):
+        """Test that a second mapping sees rows written by the first."""
+        self.store.upsert('p1', SAMPLE_RECORD)
+        other = FeatureStore(self.path)
+        try:
+            self.assertEqual(other.capacity, 100)
+            self.assertEqual(other.get('p1')['features']['height'], 165.0)
+            other.upsert('p2', SAMPLE_RECORD)
+            self.assertEqual(self.store.row('p2'), 1)
+        finally:
+            other.close()
+
+    def test_capacity_and_id_width(self):
+        """Test that overflowing the store or the ID width is rejected."""
+        store = FeatureStore(os.path.join(self.tmp.name, 'small.bin'), capacity=1)
+        try:
+            store.upsert('p1', SAMPLE_RECORD)
+            with self.assertRaises(ValueError):
+                store.upsert('p2', SAMPLE_RECORD)
+        finally:
+            store.close()
+        with self.assertRaises(ValueError):
+            self.store.upsert('x' * 40, SAMPLE_RECORD)
+
+
+if __name__ == '__main__':
+    unittest.main()
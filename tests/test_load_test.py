@@ -0,0 +1,89 @@
+"""
+Tests for the load generator.
+"""
+
+import unittest
+import sys
+import os
+import random
+import threading
+from unittest import mock
+
+from werkzeug.serving import make_server
+
+# Add the project root and web_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'web_app'))
+
+from app import app
+import load_test
+from load_test import make_payload, run_open_loop, capacity
+from models.scoring import encode_records
+
+
+class TestLoadTest(unittest.TestCase):
+    """Test cases for the load generator."""
+
+    def test_payloads_are_scorable(self):
+        """Test that synthetic payloads stay inside the form's domains."""
+        rng = random.Random(0)
+        X = encode_records([make_payload(rng) for _ in range(100)])
+        self.assertEqual(X.shape, (100, 16))
+
+    def test_capacity(self):
+        """Test the sustainable rate and saturation point of a sweep."""
+        steps = [
+            {'offered_rps': 10, 'sent_rps': 10, 'achieved_rps': 10, 'p99_ms': 20, 'error_rate': 0.0},
+            {'offered_rps': 20, 'sent_rps': 20, 'achieved_rps': 20, 'p99_ms': 80, 'error_rate': 0.0},
+            {'offered_rps': 40, 'sent_rps': 40, 'achieved_rps': 31, 'p99_ms': 900, 'error_rate': 0.0},
+            {'offered_rps': 80, 'sent_rps': 80, 'achieved_rps': 80, 'p99_ms': 90, 'error_rate': 0.0}
+        ]
+        self.assertEqual(capacity(steps, p99_target_ms=100),
+                         {'max_sustainable_rps': 20, 'saturation_rps': 40})
+
+    def test_open_loop_against_local_server(self):
+        """Test a short open-loop run against an in-process server."""
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f'http://127.0.0.1:{server.server_port}'
+            step = run_open_loop(url, rate=40, duration=0.5,
+                                 mix={'predict': 1, 'score': 1, 'home': 1, 'whatif': 1})
+        finally:
+            server.shutdown()
+
+        self.assertGreater(step['requests'], 0)
+        self.assertEqual(step['error_rate'], 0.0)
+        self.assertGreater(step['p99_ms'], 0)
+
+    def test_threads_only_for_gthread(self):
+        """Test that sync workers are not turned into gthread by --threads."""
+        with mock.patch.object(load_test.subprocess, 'Popen') as popen, \
+                mock.patch.object(load_test, 'send', return_value=200):
+            popen.return_value.poll.return_value = None
+            load_test.start_gunicorn(2, 'sync', 5099, threads=4, state_dir='/tmp/x')
+            self.assertNotIn('--threads', popen.call_args[0][0])
+            load_test.start_gunicorn(2, 'gthread', 5099, threads=4, state_dir='/tmp/x')
+            self.assertIn('--threads', popen.call_args[0][0])
+
+    def test_gunicorn_isolated_state(self):
+        """Test that local gunicorn gets its own drift/store paths and a free port."""
+        with mock.patch.object(load_test.subprocess, 'Popen') as popen, \
+                mock.patch.object(load_test, 'send', return_value=200):
+            popen.return_value.poll.return_value = None
+            load_test.start_gunicorn(1, 'sync', 5099, threads=1, state_dir='/tmp/x')
+            env = popen.call_args[1]['env']
+            self.assertEqual(env['DRIFT_DIR'], '/tmp/x/drift')
+            self.assertEqual(env['FEATURE_STORE_PATH'], '/tmp/x/feature_store.bin')
+
+            server = make_server('127.0.0.1', 0, app)
+            try:
+                with self.assertRaises(RuntimeError):
+                    load_test.start_gunicorn(1, 'sync', server.server_port, 1, '/tmp/x')
+            finally:
+                server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
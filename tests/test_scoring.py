@@ -0,0 +1,147 @@
+"""
+Tests for the vectorized scoring module.
+"""
+
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+import numpy as np
+
+# Add the project root and web_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'web_app'))
+
+from app import simple_prediction
+from models.scoring import (encode_records, score_records, score_logits, fit_temperature,
+                            save_calibration, load_calibration, format_predictions, LABEL_NAMES,
+                            expand_grid, score_grid)
+
+SAMPLE_RECORD = {
+    'gender': 'Female', 'age': '28', 'height': '165', 'weight': '70',
+    'family_history_with_overweight': 'yes', 'favc': 'yes', 'fcvc': '2', 'ncp': '3',
+    'caec': 'Sometimes', 'smoke': 'no', 'ch2o': '2', 'scc': 'no', 'faf': '1',
+    'tue': '1', 'calc': 'no', 'mtrans': 'Public_Transportation'
+}
+
+
+def random_record(rng):
+    """Draw a random record from the form's value domains."""
+    return {
+        'gender': rng.choice(['Male', 'Female']),
+        'age': str(rng.randint(14, 70)),
+        'height': str(rng.uniform(145, 200)),
+        'weight': str(rng.uniform(40, 170)),
+        'family_history_with_overweight': rng.choice(['no', 'yes']),
+        'favc': rng.choice(['no', 'yes']),
+        'fcvc': str(rng.randint(1, 3)),
+        'ncp': str(rng.randint(1, 4)),
+        'caec': rng.choice(['no', 'Sometimes', 'Frequently', 'Always']),
+        'smoke': rng.choice(['no', 'yes']),
+        'ch2o': str(rng.choice([1, 1.5, 2, 2.5, 3, 3.5, 4, 4.5, 5])),
+        'scc': rng.choice(['no', 'yes']),
+        'faf': str(rng.randint(0, 3)),
+        'tue': str(rng.randint(0, 2)),
+        'calc': rng.choice(['no', 'Sometimes', 'Frequently', 'Always']),
+        'mtrans': rng.choice(['Automobile', 'Bike', 'Motorbike', 'Public_Transportation', 'Walking'])
+    }
+
+
+class TestScoring(unittest.TestCase):
+    """Test cases for the vectorized scorer."""
+
+    def test_matches_simple_prediction(self):
+        """Test that batch labels agree with the per-record heuristic."""
+        rng = random.Random(0)
+        records = [random_record(rng) for _ in range(500)]
+        result = score_records(records)
+
+        for record, label in zip(records, result['labels']):
+            expected = simple_prediction(record)
+            if expected == 'Overweight':
+                self.assertIn(LABEL_NAMES[label], ['Overweight Level I', 'Overweight Level II'])
+            else:
+                self.assertEqual(LABEL_NAMES[label], expected)
+
+    def test_probabilities_and_top_k(self):
+        """Test the probability vector, top-k ordering and confidence."""
+        result = score_records([SAMPLE_RECORD] * 3, top_k=2)
+        probabilities = result['probabilities']
+
+        self.assertEqual(probabilities.shape, (3, 7))
+        np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+        self.assertEqual(result['top_k'].shape, (3, 2))
+        np.testing.assert_array_equal(result['top_k'][:, 0], result['labels'])
+        np.testing.assert_allclose(result['confidence'], probabilities.max(axis=1))
+
+    def test_low_confidence_flag(self):
+        """Test that a high temperature flattens scores into low confidence."""
+        result = score_records([SAMPLE_RECORD], temperature=100.0)
+        self.assertTrue(result['low_confidence'][0])
+
+        prediction = format_predictions(result)[0]
+        self.assertTrue(prediction['low_confidence'])
+        self.assertEqual(len(prediction['probabilities']), 7)
+
+    def test_band_edges_use_threshold_class(self):
+        """Test that a score on a cut-off goes to the upper class."""
+        _, labels = score_logits(np.array([0.3, 0.95]))
+        np.testing.assert_array_equal(labels, [1, 6])
+
+    def test_fit_and_store_temperature(self):
+        """Test temperature fitting and the calibration round trip."""
+        rng = random.Random(1)
+        records = [random_record(rng) for _ in range(200)]
+        logits, labels = score_logits(score_records(records)['scores'])
+        temperature, _ = fit_temperature(logits, labels)
+        self.assertLess(temperature, 1.0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'calibration.json')
+            self.assertEqual(load_calibration(path), 1.0)
+            save_calibration(temperature, path)
+            self.assertAlmostEqual(load_calibration(path), temperature)
+
+    def test_missing_fields(self):
+        """Test that incomplete records are rejected."""
+        with self.assertRaises(ValueError):
+            encode_records([{'age': '30'}])
+
+    def test_invalid_values(self):
+        """Test that unknown categories and non-finite or non-positive numbers are rejected."""
+        for field, value in (('mtrans', 'Rocket'), ('age', 'nan'), ('height', '0'),
+                             ('weight', 'inf'), ('tue', '-1')):
+            with self.assertRaises(ValueError):
+                encode_records([dict(SAMPLE_RECORD, **{field: value})])
+        self.assertEqual(encode_records([dict(SAMPLE_RECORD, faf='0')])[0, 12], 0.0)
+
+
+class TestWhatIf(unittest.TestCase):
+    """Test cases for what-if grid scoring."""
+
+    def test_grid_matches_individual_records(self):
+        """Test that each grid cell scores like the equivalent record."""
+        adjustments = {'faf': ['0', '3'], 'mtrans': ['Walking', 'Automobile', 'Bike']}
+        grid = score_grid(SAMPLE_RECORD, adjustments)
+        self.assertEqual(grid['shape'], [2, 3])
+
+        for i, faf in enumerate(adjustments['faf']):
+            for j, mtrans in enumerate(adjustments['mtrans']):
+                record = dict(SAMPLE_RECORD, faf=faf, mtrans=mtrans)
+                self.assertEqual(grid['categories'][i][j], score_records([record])['labels'][0])
+
+    def test_grid_validation(self):
+        """Test that invalid fields, values and oversized grids are rejected."""
+        base = encode_records([SAMPLE_RECORD])[0]
+        for adjustments in ({}, {'weight': [60, 70]}, {'mtrans': ['Rocket']},
+                            {'faf': [[1]]}, {'faf': [{'a': 1}]}, {'faf': [True]},
+                            {'faf': [100, -50]}, {'ch2o': [0.5]},
+                            {'faf': [0, 1, 2, 3] * 10, 'ch2o': [1, 2, 3, 4, 5] * 8}):
+            with self.assertRaises(ValueError, msg=adjustments):
+                expand_grid(base, adjustments)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for tenant-scoped scoring profiles.
+"""
+
+import unittest
+import sys
+import os
+import json
+import pickle
+import random
+import tempfile
+
+import numpy as np
+
+# Add the project root and tests directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from test_scoring import random_record
+from models.evaluate import RuleBasedScorer
+from models.scoring import encode_records, score_features
+from models.tenants import TenantTable, load_tenants
+
+CLINIC_A = {
+    'bmi_weight': 0.7,
+    'lifestyle_weight': 0.3,
+    'thresholds': [0.2, 0.35, 0.45, 0.55, 0.7, 0.8],
+    'factor_weights': {'family_history': 0.5, 'low_activity': 0.05}
+}
+
+
+class TestTenants(unittest.TestCase):
+    """Test cases for tenant scoring profiles."""
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.X = encode_records([random_record(rng) for _ in range(200)])
+        self.table = TenantTable({'clinic-a': CLINIC_A}, version='2026.10.1')
+
+    def test_default_tenant_matches_scorer(self):
+        """Test that the default tenant reproduces the built-in heuristic."""
+        result = self.table.score(self.X, self.table.indices(['default'] * len(self.X)))
+        np.testing.assert_allclose(result['probabilities'], score_features(self.X)['probabilities'])
+
+    def test_mixed_batch_matches_single_tenant_batches(self):
+        """Test that one mixed-tenant pass equals scoring each tenant on its own."""
+        tenants = np.array(['default', 'clinic-a'])[np.arange(len(self.X)) % 2]
+        mixed = self.table.score(self.X, self.table.indices(tenants))
+
+        for name in ('default', 'clinic-a'):
+            rows = tenants == name
+            alone = self.table.scorer(name)(self.X[rows])
+            np.testing.assert_array_equal(mixed['labels'][rows], alone['labels'])
+            np.testing.assert_allclose(mixed['scores'][rows], alone['scores'])
+
+        self.assertFalse(np.array_equal(mixed['labels'][tenants == 'clinic-a'],
+                                        score_features(self.X[tenants == 'clinic-a'])['labels']))
+
+    def test_invalid_profiles(self):
+        """Test that malformed bundles are rejected at load time."""
+        with self.assertRaises(ValueError):
+            TenantTable({'bad': {'thresholds': [0.9, 0.5, 0.6, 0.7, 0.8, 0.95]}})
+        with self.assertRaises(ValueError):
+            TenantTable({'bad': {'factor_weights': {'sleep': 0.1}}})
+        with self.assertRaises(ValueError):
+            TenantTable({'bad': {'cutoffs': []}})
+        with self.assertRaises(ValueError):
+            self.table.indices(['clinic-z'])
+
+    def test_load_bundle_with_model(self):
+        """Test loading a bundle whose tenant uses its own pickled model."""
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, 'clinic-b.pkl'), 'wb') as fh:
+                pickle.dump(RuleBasedScorer(), fh)
+            path = os.path.join(tmp, 'tenants.json')
+            with open(path, 'w', encoding='utf-8') as fh:
+                json.dump({'version': '3', 'tenants': {'clinic-a': CLINIC_A,
+                                                       'clinic-b': {'model': 'clinic-b.pkl'}}}, fh)
+            table = load_tenants(path)
+
+        self.assertEqual(table.version, '3')
+        self.assertEqual(table.names, ['clinic-a', 'clinic-b', 'default'])
+        result = table.scorer('clinic-b')(self.X)
+        np.testing.assert_array_equal(result['labels'], score_features(self.X)['labels'])
+        np.testing.assert_array_equal(result['confidence'], 1.0)
+
+    def test_missing_bundle(self):
+        """Test that only the default tenant exists without a bundle."""
+        self.assertEqual(load_tenants('/nonexistent/tenants.json').names, ['default'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, jsonify
 import pandas as pd
 import numpy as np
 import sys
@@ -9,9 +9,29 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from config import OBESITY_LABELS, NUMERICAL_COLUMNS
 from config import GENDER_MAPPING, MTRANS_MAPPING, FAMILY_HISTORY_MAPPING
 from config import FAVC_MAPPING, SMOKE_MAPPING, SCC_MAPPING, CAEC_MAPPING, CALC_MAPPING
+from config import DEFAULT_TOP_K, DEFAULT_TENANT, TENANT_HEADER
+from models.scoring import encode_records, score_grid, format_predictions, LABEL_NAMES
+from models.tenants import load_tenants
+from data.drift import DriftMonitor
+from data.feature_store import FeatureStore
 
 app = Flask(__name__)
 
+# Per-tenant scoring profiles, compiled into parameter arrays at start-up
+tenant_table = load_tenants()
+
+# Live input sketches, compared against the training profile (if built)
+drift_monitor = DriftMonitor()
+
+# Shared store of repeat patients' features, opened on first use
+feature_store = None
+
+def get_feature_store():
+    global feature_store
+    if feature_store is None:
+        feature_store = FeatureStore()
+    return feature_store
+
 # Simple prediction function based on BMI and lifestyle factors
 def simple_prediction(data):
     """Simple prediction based on BMI and lifestyle factors"""
@@ -124,21 +144,132 @@ def simple_prediction(data):
 def form():
     return render_template('full.html', model_loaded=True)
 
+def resolve_tenant(tenant=None):
+    """Tenant from the /t/<tenant>/ path prefix, the tenant header or the default."""
+    return tenant or request.headers.get(TENANT_HEADER) or DEFAULT_TENANT
+
 @app.route('/predict', methods=['POST'])
-def predict():
+@app.route('/t/<tenant>/predict', methods=['POST'])
+def predict(tenant=None):
+    tenant = resolve_tenant(tenant)
+    if tenant not in tenant_table.index:
+        return f"Error: Unknown tenant {tenant}", 404
     try:
         data = request.form.to_dict()
         print("Received data:", data)
+        drift_monitor.update(data)
         
-        # Use simple prediction algorithm
-        prediction = simple_prediction(data)
+        if tenant not in tenant_table.configured:
+            # Use simple prediction algorithm unless the bundle overrides the default
+            prediction = simple_prediction(data)
+        else:
+            result = tenant_table.scorer(tenant)(encode_records([data]))
+            prediction = LABEL_NAMES[result['labels'][0]]
         print(f"Prediction: {prediction}")
         
-        return render_template('output.html', prediction=prediction)
+        return render_template('output.html', prediction=prediction, profile=data, tenant=tenant)
     except Exception as e:
         print("Error:", e)
         return f"Error: {str(e)}", 500
 
+@app.route('/api/score', methods=['POST'])
+@app.route('/t/<tenant>/api/score', methods=['POST'])
+def score(tenant=None):
+    """Score one record or a batch with class probabilities and confidence.
+
+    On the unscoped endpoint records may carry their own ``tenant``, and
+    mixed-tenant batches are scored in one pass. A tenant given by the path
+    or header applies to every record.
+    """
+    scoped = tenant is not None or TENANT_HEADER in request.headers
+    tenant = resolve_tenant(tenant)
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify({'error': 'Expected a JSON body'}), 400
+
+    records = payload.get('records', [payload]) if isinstance(payload, dict) else payload
+    top_k = payload.get('top_k', DEFAULT_TOP_K) if isinstance(payload, dict) else DEFAULT_TOP_K
+    if not isinstance(records, list) or not records:
+        return jsonify({'error': 'Expected a record or a non-empty list of records'}), 400
+
+    try:
+        tenants = [record.get('tenant', tenant) for record in records]
+        if scoped and any(name != tenant for name in tenants):
+            return jsonify({'error': f'Records must belong to tenant {tenant}'}), 400
+        result = tenant_table.score(encode_records(records), tenant_table.indices(tenants),
+                                    top_k=top_k)
+    except (ValueError, TypeError, AttributeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'predictions': format_predictions(result),
+                    'config_version': tenant_table.version})
+
+@app.route('/api/whatif', methods=['POST'])
+@app.route('/t/<tenant>/api/whatif', methods=['POST'])
+def whatif(tenant=None):
+    """Score a grid of lifestyle adjustments to one profile in a single batch."""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    profile = payload.get('profile')
+    adjustments = payload.get('adjustments', {})
+    if not isinstance(profile, dict) or not isinstance(adjustments, dict):
+        return jsonify({'error': 'Expected a profile and a mapping of adjustments'}), 400
+    if not all(isinstance(values, list) for values in adjustments.values()):
+        return jsonify({'error': 'Each adjustment must be a list of values'}), 400
+
+    try:
+        scorer = tenant_table.scorer(resolve_tenant(tenant))
+        base = format_predictions(scorer(encode_records([profile])))[0]
+        grid = score_grid(profile, adjustments, score=scorer)
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'base': base, **grid})
+
+@app.route('/api/patients/<patient_id>', methods=['GET'])
+@app.route('/t/<tenant>/api/patients/<patient_id>', methods=['GET'])
+def get_patient(patient_id, tenant=None):
+    """Stored features and last prediction of one of the tenant's patients."""
+    entry = get_feature_store().get(patient_id, resolve_tenant(tenant))
+    if entry is None:
+        return jsonify({'error': f'Unknown patient {patient_id}'}), 404
+    return jsonify(entry)
+
+@app.route('/api/patients/<patient_id>', methods=['PUT'])
+@app.route('/t/<tenant>/api/patients/<patient_id>', methods=['PUT'])
+def put_patient(patient_id, tenant=None):
+    """Store a patient's profile (or just the changed fields) and score it.
+
+    The stored prediction is reused when no field changed, the row is not
+    awaiting a rescore and the tenant's model version is the one it was
+    scored with.
+    """
+    fields = request.get_json(silent=True)
+    if not isinstance(fields, dict):
+        return jsonify({'error': 'Expected a JSON object of form fields'}), 400
+
+    store = get_feature_store()
+    try:
+        tenant = resolve_tenant(tenant)
+        version = tenant_table.model_version(tenant)
+        row, changed = store.upsert(patient_id, fields, tenant)
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    cached = (not changed and not store.dirty[row]
+              and store.model_versions[row].decode('utf-8') == version)
+    if not cached:
+        store.rescore(tenant_table, rows=np.array([row]))
+    return jsonify({**store.get(patient_id, tenant), 'cached': cached})
+
+@app.route('/api/drift', methods=['GET'])
+def drift():
+    """Drift scores of live traffic, merged across workers."""
+    report = drift_monitor.report()
+    return jsonify(report), (503 if 'error' in report else 200)
+
 if __name__ == '__main__':
     # Production settings for EC2 deployment
     debug_mode = os.environ.get('FLASK_DEBUG', '0') == '1'
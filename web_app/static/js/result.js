@@ -72,11 +72,90 @@ function addBounceAnimation() {
     document.head.appendChild(style);
 }
 
+// What-if grid: physical activity (rows) x water intake (columns)
+const whatIfAdjustments = {
+    'faf': [0, 1, 2, 3],
+    'ch2o': [1, 2, 3, 4, 5]
+};
+
+// Map a predicted label to its category indicator class
+function categoryClass(label) {
+    if (label.includes('Insufficient')) return 'category-insufficient';
+    if (label.includes('Normal')) return 'category-normal';
+    if (label.includes('Overweight')) return 'category-overweight';
+    return 'category-obesity';
+}
+
+// Render the what-if response as a category matrix
+function renderWhatIfMatrix(container, result, profile = {}) {
+    const [rowField, colField] = result.fields;
+    const isCurrent = (field, value) => Number(profile[field]) === Number(value);
+    const table = document.createElement('table');
+
+    const header = table.insertRow();
+    header.appendChild(document.createElement('th')).textContent = `${rowField} / ${colField}`;
+    result.values[colField].forEach(value => {
+        header.appendChild(document.createElement('th')).textContent = value;
+    });
+
+    result.values[rowField].forEach((rowValue, i) => {
+        const row = table.insertRow();
+        row.appendChild(document.createElement('th')).textContent = rowValue;
+        result.categories[i].forEach((category, j) => {
+            const label = result.labels[category];
+            const cell = row.insertCell();
+            cell.textContent = label;
+            cell.title = `Confidence: ${(result.confidence[i][j] * 100).toFixed(0)}%`;
+            cell.classList.add(categoryClass(label));
+            if (isCurrent(rowField, rowValue) && isCurrent(colField, result.values[colField][j])) {
+                cell.classList.add('whatif-current');
+            }
+        });
+    });
+
+    container.replaceChildren(table);
+}
+
+// Request the what-if grid for the submitted profile
+function setupWhatIf() {
+    const section = document.getElementById('whatifSection');
+    const container = document.getElementById('whatifMatrix');
+    const base = document.getElementById('whatifBase');
+    if (!section || !container) return;
+    const profile = JSON.parse(section.dataset.profile);
+
+    fetch('/api/whatif', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-Tenant': section.dataset.tenant
+        },
+        body: JSON.stringify({
+            profile: profile,
+            adjustments: whatIfAdjustments
+        })
+    })
+        .then(response => response.ok ? response.json() : Promise.reject(response.status))
+        .then(result => {
+            // The headline uses the simple 6-band rule; show the scorer's own
+            // category for the current profile so the highlighted cell matches
+            if (base) {
+                base.textContent = `Your current profile on this scorer: ${result.base.prediction}`;
+            }
+            renderWhatIfMatrix(container, result, profile);
+        })
+        .catch(error => {
+            console.log('What-if analysis unavailable:', error);
+            section.style.display = 'none';
+        });
+}
+
 // Initialize the result page
 function initResultPage() {
     addBounceAnimation();
     setupResultAnimations();
     setupCategoryAnimations();
+    setupWhatIf();
     
     console.log('Result page initialized successfully!');
 }
@@ -91,6 +170,7 @@ if (typeof module !== 'undefined' && module.exports) {
     module.exports = {
         setupResultAnimations,
         printResult,
+        renderWhatIfMatrix,
         initResultPage
     };
 } 
\ No newline at end of file